@@ -11,15 +11,15 @@ What the script does:
 4) After downloading — MAXIMUM cleanup:
    - Removes broken/invalid files and too small images.
    - Filters "is cat / not cat" (MobileNetV2 by ImageNet classes 281–285).
-   - Removes exact duplicates (MD5) and near-duplicates (perceptual hash dHash).
+   - Removes exact duplicates (content hash) and near-duplicates (perceptual hash dHash).
    - Normalizes EXIF orientation, converts to .jpg (optionally).
 5) Resumability: if breed folder already has enough images — skips download.
-6) Creates manifest.csv with paths and metadata.
+6) Creates manifest.parquet (or manifest.csv) with paths and metadata.
 
 Dependencies (minimum):
-    pip install icrawler pillow opencv-python-headless tensorflow==2.* numpy
+    pip install icrawler pillow tensorflow==2.* numpy
 Additional (optional, speeds up cleanup):
-    pip install imagehash
+    pip install imagehash xxhash pyarrow
 
 Usage:
     python build_cat_dataset.py \
@@ -42,18 +42,20 @@ from __future__ import annotations
 import os
 import re
 import io
-import cv2
 import sys
 import csv
 import json
 import time
 import math
-import glob
 import uuid
+import mmap
 import hashlib
 import logging
 import argparse
+import threading
 import traceback
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 from dataclasses import dataclass
 from typing import List, Tuple, Dict, Optional
 
@@ -91,6 +93,53 @@ try:
 except Exception:
     IMAGEHASH_OK = False
 
+# Fast non-cryptographic file hash (if available). Otherwise fall back to MD5.
+try:
+    import xxhash
+    XXHASH_OK = True
+except Exception:
+    XXHASH_OK = False
+
+# CLIP embeddings for second-pass near-dup verification (see --sscd-verify)
+try:
+    import torch
+    import open_clip
+    CLIP_OK = True
+except Exception:
+    CLIP_OK = False
+
+# Parquet manifest output (if available). Otherwise CSV.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_OK = True
+except Exception:
+    PYARROW_OK = False
+
+# Numba JIT for the Hamming popcount kernel on large folders (optional)
+try:
+    import numba as nb
+    NUMBA_OK = True
+except Exception:
+    NUMBA_OK = False
+
+if NUMBA_OK:
+    @nb.njit(parallel=True, fastmath=True, cache=True)
+    def _hamming_rows(rows, q):
+        """Hamming distance of q against each row (uint64 lanes, SWAR popcount)."""
+        n, k = rows.shape
+        out = np.empty(n, np.int64)
+        for i in nb.prange(n):
+            d = 0
+            for j in range(k):
+                x = rows[i, j] ^ q[j]
+                x = x - ((x >> 1) & 0x5555555555555555)
+                x = (x & 0x3333333333333333) + ((x >> 2) & 0x3333333333333333)
+                x = (x + (x >> 4)) & 0x0F0F0F0F0F0F0F0F
+                d += (x * 0x0101010101010101) >> 56
+            out[i] = d
+        return out
+
 
 # ----------------------------- Breed list (220+ entries) -----------------------------
 # Sources combined from CFA/TICA/WCF/encyclopedias; includes aliases and variations for better search coverage.
@@ -204,6 +253,12 @@ def parse_args():
                    help="DISABLE 'is cat' check (faster, but lower quality)")
     p.add_argument("--no-near-dup", action="store_true",
                    help="DISABLE near-duplicate removal (dHash)")
+    p.add_argument("--io-workers", type=int, default=4,
+                   help="Threads for file hashing (overlaps reads on SSD; use 1 for HDD)")
+    p.add_argument("--sscd-verify", action="store_true",
+                   help="Verify pHash near-dup pairs with CLIP embeddings (needs torch+open_clip)")
+    p.add_argument("--csv-manifest", action="store_true",
+                   help="Also write manifest.csv alongside manifest.parquet")
     p.add_argument("--limit-breeds", type=int, default=0,
                    help="Limit number of breeds (for testing). 0 = no limit.")
     return p.parse_args()
@@ -236,102 +291,155 @@ def make_logger(out_dir: str) -> logging.Logger:
 
 
 # ------------------------------ Utilities ------------------------------
+_SLUG_NONALNUM = re.compile(r"[^a-z0-9]+")
+_SLUG_UNDERS = re.compile(r"_+")
+
+
+@lru_cache(maxsize=None)
 def slugify(name: str) -> str:
+    # Патерны скомпилированы на импорте; сама функция чистая и зовётся
+    # по несколько раз на породу — кэшируем по конечному списку пород
     name = name.strip().lower()
-    name = re.sub(r"[^a-z0-9]+", "_", name)
-    name = re.sub(r"_+", "_", name).strip("_")
-    return name
+    name = _SLUG_NONALNUM.sub("_", name)
+    return _SLUG_UNDERS.sub("_", name).strip("_")
 
 
-def list_images(folder: str) -> List[str]:
-    exts = ("*.jpg", "*.jpeg", "*.png", "*.bmp", "*.webp", "*.gif")
-    paths = []
-    for e in exts:
-        paths.extend(glob.glob(os.path.join(folder, e)))
-    return paths
+_IMG_EXTS = frozenset({".jpg", ".jpeg", ".png", ".bmp", ".webp", ".gif"})
 
 
-def file_md5(path: str) -> str:
-    h = hashlib.md5()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1 << 20), b""):
-            h.update(chunk)
-    return h.hexdigest()
+def list_images(folder: str) -> List[str]:
+    """One os.scandir pass instead of a glob per extension pattern."""
+    try:
+        return [e.path for e in os.scandir(folder)
+                if e.is_file() and os.path.splitext(e.name)[1].lower() in _IMG_EXTS]
+    except FileNotFoundError:
+        return []
 
 
-def ensure_pillow_image(path: str) -> Optional[Image.Image]:
-    if not PIL_OK:
-        return None
-    try:
-        with Image.open(path) as im:
-            im.load()
-            return im
-    except (UnidentifiedImageError, OSError):
-        return None
+def file_hash(path: str) -> str:
+    """Content hash for exact-duplicate detection.
 
+    Dedup needs speed, not cryptographic strength: xxh3_64 is SIMD-
+    accelerated and an order of magnitude faster than MD5, which stays
+    as the fallback when xxhash is not installed.
 
-def exif_normalize_and_convert_jpg(path: str, out_path: str, quality: int = 92) -> bool:
-    """Normalizes EXIF orientation and saves to .jpg"""
-    if not PIL_OK:
-        return False
-    try:
-        with Image.open(path) as im:
-            im = ImageOps.exif_transpose(im)
-            if im.mode in ("RGBA", "LA"):
-                bg = Image.new("RGB", im.size, (255, 255, 255))
-                bg.paste(im, mask=im.split()[-1])
-                im = bg
-            else:
-                im = im.convert("RGB")
-            im.save(out_path, "JPEG", optimize=True, quality=quality, progressive=True)
-        return True
-    except Exception:
-        return False
+    The file is fed to the hash as one contiguous mmap buffer instead of
+    1 MiB read() chunks: no kernel->bytes copy per chunk, and a single
+    update() lets the hash run its vectorized compression uninterrupted.
+    """
+    with open(path, "rb") as f:
+        if not XXHASH_OK:
+            return hashlib.file_digest(f, "md5").hexdigest()
+        h = xxhash.xxh3_64()
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        except (ValueError, OSError):  # empty file or mmap not available
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
 
 
-def cv2_read_size(path: str) -> Tuple[int, int]:
-    """Returns (w, h) or (0, 0) if unable to read"""
-    try:
-        img = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
-        if img is None:
-            return (0, 0)
-        h, w = img.shape[:2]
-        return (w, h)
-    except Exception:
-        return (0, 0)
+def simple_dhash(image_path: str, hash_size: int = 8) -> Optional[np.ndarray]:
+    """Own dHash implementation (if no imagehash).
 
+    The gradient comparison is done as one vectorized column-slice compare
+    instead of hash_size*hash_size `getpixel` calls — the hash runs for
+    every surviving image, so interpreter overhead here adds up fast.
 
-def simple_dhash(image_path: str, hash_size: int = 8) -> Optional[int]:
-    """Own dHash implementation (if no imagehash), returns int or None."""
+    Returns the hash as a (hash_size*hash_size // 64,) uint64 array rather
+    than a Python int: keeping hashes in fixed-width lanes end to end is
+    what lets the dedup index XOR/popcount them without bigint round-trips.
+    """
     try:
         with Image.open(image_path) as img:
-            img = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
-            diff = []
-            for y in range(hash_size):
-                for x in range(hash_size):
-                    left = img.getpixel((x, y))
-                    right = img.getpixel((x + 1, y))
-                    diff.append(left > right)
-            # Convert to int
-            v = 0
-            for b in diff:
-                v = (v << 1) | int(b)
-            return v
+            a = np.asarray(
+                img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS),
+                dtype=np.uint8
+            )
+        diff = a[:, :-1] > a[:, 1:]
+        return np.packbits(diff.reshape(-1)).view(np.uint64)
     except Exception:
         return None
 
 
-def hamming_distance(a: int, b: int) -> int:
-    return (a ^ b).bit_count()
+class NearDupIndex:
+    """Index of perceptual hashes for near-duplicate lookup.
+
+    The naive approach compares each new hash against every hash seen so
+    far — O(N²) per breed folder. Instead the 256-bit hash is split into
+    16-bit bands kept in a hash table: any pair within Hamming distance
+    <= max_distance (far fewer than the number of bands) must share at
+    least one band exactly (pigeonhole), so only the handful of images in
+    matching buckets needs an actual distance check.
+    """
+
+    BAND_BITS = 16
+
+    def __init__(self, hash_bits: int = 256, max_distance: int = 6):
+        self.hash_bits = hash_bits
+        self.max_distance = max_distance
+        self.n_bands = hash_bits // self.BAND_BITS
+        self.n_lanes = hash_bits // 64
+        self.size = 0
+        self.paths: List[str] = []
+        # Hashes live in a (cap, n_lanes) uint64 array grown in powers of two,
+        # so candidate verification is one XOR + popcount over all rows at once.
+        self._arr = np.zeros((64, self.n_lanes), dtype=np.uint64)
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+
+    def _bands(self, lanes: np.ndarray) -> List[Tuple[int, int]]:
+        return list(enumerate(lanes.view(np.uint16).tolist()))
+
+    def find_near(self, lanes: np.ndarray) -> Optional[str]:
+        """Path of the closest already-seen image within max_distance, or None."""
+        candidates = set()
+        for key in self._bands(lanes):
+            candidates.update(self._buckets.get(key, ()))
+        if not candidates:
+            return None
+        idx = sorted(candidates)
+        if NUMBA_OK and len(idx) >= 32:
+            # JIT-ядро с SWAR-popcount по потокам — окупается на больших
+            # кластерах кандидатов, где unpackbits начинает упираться в память
+            dists = _hamming_rows(np.ascontiguousarray(self._arr[idx]), lanes)
+        else:
+            xor = self._arr[idx] ^ lanes
+            dists = np.unpackbits(xor.view(np.uint8), axis=1).sum(axis=1)
+        best = int(np.argmin(dists))
+        if dists[best] <= self.max_distance:
+            return self.paths[idx[best]]
+        return None
+
+    def is_near_dup(self, lanes: np.ndarray) -> bool:
+        return self.find_near(lanes) is not None
+
+    def add(self, lanes: np.ndarray, path: str = "") -> None:
+        if self.size == len(self._arr):
+            self._arr = np.concatenate([self._arr, np.zeros_like(self._arr)])
+        self._arr[self.size] = lanes
+        self.paths.append(path)
+        for key in self._bands(lanes):
+            self._buckets.setdefault(key, []).append(self.size)
+        self.size += 1
 
 
 # ------------------------- "is cat" filter (MobileNetV2) -------------------------
+# Batch size for the "is cat" pass: big enough to amortize per-call overhead,
+# small enough to keep the stacked float32 batch cheap in memory.
+CAT_BATCH_SIZE = 64
+
+
 class CatFilter:
-    def __init__(self, threshold: float = 0.20, disabled: bool = False, logger: Optional[logging.Logger] = None):
+    def __init__(self, threshold: float = 0.20, disabled: bool = False,
+                 logger: Optional[logging.Logger] = None, cache_dir: Optional[str] = None):
         self.threshold = threshold
         self.disabled = disabled or (not TF_OK)
         self.logger = logger
         self.model = None
+        self.interp = None
+        # Inference can be called from cleanup worker threads; serialize model calls.
+        self._lock = threading.Lock()
         if self.disabled:
             if self.logger:
                 self.logger.info("'is cat' filter disabled (TF_OK=%s).", TF_OK)
@@ -344,26 +452,255 @@ class CatFilter:
                 self.disabled = True
                 if self.logger:
                     self.logger.warning("Failed to load MobileNetV2: %s. 'is cat' filter disabled.", e)
+        if not self.disabled:
+            try:
+                self._init_tflite(cache_dir)
+                if self.logger:
+                    self.logger.info("Using int8 TFLite interpreter for 'is cat' filter.")
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning("TFLite conversion failed (%s), staying on Keras model.", e)
+
+    def _init_tflite(self, cache_dir: Optional[str]) -> None:
+        """Dynamic-range int8 TFLite interpreter: halves weight bandwidth and
+        skips the Keras predict() dispatch entirely. Conversion takes a few
+        seconds, so the FlatBuffer is cached on disk when a cache_dir is given.
+        """
+        cache_path = os.path.join(cache_dir, "mobilenet_v2_int8.tflite") if cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "rb") as f:
+                content = f.read()
+        else:
+            converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]  # dynamic-range int8
+            content = converter.convert()
+            if cache_path:
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(cache_path, "wb") as f:
+                    f.write(content)
+        interp = tf.lite.Interpreter(model_content=content, num_threads=os.cpu_count())
+        interp.allocate_tensors()
+        self.interp = interp
+        self._interp_in = interp.get_input_details()[0]
+        self._interp_out = interp.get_output_details()[0]
+
+    def _decode_tfdata(self, paths: List[str]) -> np.ndarray:
+        """Decode+resize a batch of files through tf.data (AUTOTUNE-parallel)."""
+        def _load(p):
+            img = tf.io.read_file(p)
+            img = tf.image.decode_image(img, channels=3, expand_animations=False)
+            img.set_shape([None, None, 3])
+            return tf.image.resize(img, [224, 224], method="bilinear")
+
+        ds = tf.data.Dataset.from_tensor_slices(paths).map(
+            _load, num_parallel_calls=tf.data.AUTOTUNE
+        ).batch(len(paths))
+        return next(iter(ds.as_numpy_iterator()))
+
+    def _predict(self, x: np.ndarray) -> np.ndarray:
+        """Forward pass on the TFLite interpreter (or Keras fallback)."""
+        if self.interp is None:
+            return self.model(x, training=False).numpy()
+        if tuple(self._interp_in["shape"]) != x.shape:
+            self.interp.resize_tensor_input(self._interp_in["index"], x.shape)
+            self.interp.allocate_tensors()
+            self._interp_in = self.interp.get_input_details()[0]
+            self._interp_out = self.interp.get_output_details()[0]
+        self.interp.set_tensor(self._interp_in["index"], x)
+        self.interp.invoke()
+        return self.interp.get_tensor(self._interp_out["index"])
 
     def is_cat(self, path: str) -> bool:
+        return self.are_cats([path])[0]
+
+    def are_cats(self, paths: List[str],
+                 thumbs: Optional[Dict[str, np.ndarray]] = None) -> List[bool]:
+        """Batched 'is cat' check: one forward pass for the whole batch.
+
+        Calling the model once per image makes the pass dispatch-bound:
+        for a model as small as MobileNetV2 the per-call Python/TF overhead
+        dominates the actual compute. Stacking the batch into one array and
+        calling the model directly (not `.predict`) amortizes that overhead.
+
+        `thumbs` can carry 224×224 arrays already produced while the images
+        were decoded for validation, skipping a second JPEG decode here.
+        """
         if self.disabled or self.model is None:
-            return True  # don't filter
+            return [True] * len(paths)  # don't filter
+
+        # Decode/resize; unreadable files are treated as "not cat" (removed later)
+        arrays: List[Optional[np.ndarray]] = [
+            thumbs.get(p) if thumbs else None for p in paths
+        ]
+        missing = [i for i, a in enumerate(arrays) if a is None]
+        if missing:
+            try:
+                # tf.data декодирует и ресайзит в C++-рантайме параллельно,
+                # без GIL; один битый файл роняет весь пайплайн — тогда PIL
+                decoded = self._decode_tfdata([paths[i] for i in missing])
+                for i, a in zip(missing, decoded):
+                    arrays[i] = a
+            except Exception:
+                for i in missing:
+                    try:
+                        with Image.open(paths[i]) as img:
+                            arrays[i] = make_thumb224(img)
+                    except Exception:
+                        arrays[i] = None
+
+        valid_idx = [i for i, a in enumerate(arrays) if a is not None]
+        verdicts = [False] * len(paths)
+        if not valid_idx:
+            return verdicts
+
         try:
-            img = Image.open(path).convert("RGB").resize((224, 224), Image.Resampling.BILINEAR)
-            x = np.array(img, dtype=np.float32)
-            x = np.expand_dims(x, axis=0)
+            x = np.stack([arrays[i] for i in valid_idx]).astype(np.float32)
             x = preprocess_input(x)
-            preds = self.model.predict(x, verbose=0)
-            top = np.argmax(preds[0])
-            prob = float(preds[0][top])
+            with self._lock:
+                preds = self._predict(x)
+            top = np.argmax(preds, axis=1)
+            prob = preds[np.arange(len(valid_idx)), top]
             # ImageNet: 281–285 — cat classes
-            is_cat = (281 <= top <= 285) and (prob >= self.threshold)
-            return bool(is_cat)
+            ok = (top >= 281) & (top <= 285) & (prob >= self.threshold)
+            for i, v in zip(valid_idx, ok):
+                verdicts[i] = bool(v)
         except Exception:
-            return False
+            pass
+        return verdicts
+
+
+class EmbeddingVerifier:
+    """Second opinion on pHash near-duplicate pairs.
+
+    pHash is known to false-positive on "small subject on a uniform
+    background" shots, which breed-card crops are full of. Only pairs
+    already inside the Hamming threshold ever reach this check, so the
+    expensive CLIP forward pass runs on a tiny fraction of images. A pair
+    is confirmed as duplicate only if the embedding cosine also clears
+    the threshold; if the check itself fails, the pHash verdict stands.
+    """
+
+    def __init__(self, threshold: float = 0.9, logger: Optional[logging.Logger] = None):
+        self.threshold = threshold
+        self.logger = logger
+        self._cache: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.model, _, self.preprocess = open_clip.create_model_and_transforms(
+            "ViT-B-32", pretrained="openai"
+        )
+        self.model.eval()
+        if self.logger:
+            self.logger.info("Loaded CLIP ViT-B/32 for near-dup verification.")
+
+    def _embed(self, path: str) -> np.ndarray:
+        emb = self._cache.get(path)
+        if emb is None:
+            with Image.open(path) as im:
+                x = self.preprocess(im.convert("RGB")).unsqueeze(0)
+            with self._lock, torch.no_grad():
+                t = self.model.encode_image(x)[0]
+            emb = (t / t.norm()).numpy()
+            self._cache[path] = emb
+        return emb
+
+    def same_image(self, a: str, b: str) -> bool:
+        try:
+            return float(np.dot(self._embed(a), self._embed(b))) > self.threshold
+        except Exception:
+            return True  # проверка не удалась — оставляем вердикт pHash
+
+
+def make_thumb224(img: Image.Image) -> np.ndarray:
+    """224×224 uint8 RGB array for the 'is cat' filter; uint8 keeps the cache small."""
+    img = img.convert("RGB").resize((224, 224), Image.Resampling.BILINEAR)
+    return np.asarray(img, dtype=np.uint8)
 
 
 # ------------------------------ Breed folder cleanup ------------------------------
+# Per-file stage workers live at module level so ProcessPoolExecutor can
+# pickle them; they take plain paths/flags and return plain tuples.
+
+def stage_validate_convert(p: str, min_side: int, jpg_only: bool,
+                           keep_intermediate: bool, want_thumb: bool):
+    """Validate/convert one file on a single decode.
+
+    Returns (status, final_path, w, h, thumb) where status is one of
+    "ok" / "small" / "broken"; removed files report their removal reason.
+    """
+    try:
+        with Image.open(p) as im:
+            w, h = im.size
+            if w == 0 or h == 0 or min(w, h) < min_side:
+                try:
+                    os.remove(p)
+                except Exception:
+                    pass
+                return ("small", p, 0, 0, None)
+
+            im.load()  # битый файл бросит исключение здесь
+            im = ImageOps.exif_transpose(im)
+
+            # Приведение к .jpg
+            if jpg_only:
+                base, ext = os.path.splitext(p)
+                out_jpg = base + ".jpg"
+                if ext.lower() not in [".jpg", ".jpeg"] or not os.path.exists(out_jpg):
+                    if im.mode in ("RGBA", "LA"):
+                        bg = Image.new("RGB", im.size, (255, 255, 255))
+                        bg.paste(im, mask=im.split()[-1])
+                        im = bg
+                    else:
+                        im = im.convert("RGB")
+                    im.save(out_jpg, "JPEG", optimize=True, quality=92, progressive=True)
+                    if not keep_intermediate and out_jpg != p:
+                        try:
+                            os.remove(p)
+                        except Exception:
+                            pass
+                    p = out_jpg
+
+            thumb = make_thumb224(im) if want_thumb else None
+    except Exception:
+        try:
+            os.remove(p)
+        except Exception:
+            pass
+        return ("broken", p, 0, 0, None)
+    return ("ok", p, w, h, thumb)
+
+
+def stage_hash(p: str) -> Optional[str]:
+    """Content hash of one file, or None if unreadable."""
+    try:
+        return file_hash(p)
+    except Exception:
+        return None
+
+
+def stage_head_hash(p: str, n: int = 1 << 16) -> Optional[str]:
+    """Hash of the leading 64 KiB — cheap pre-filter inside same-size groups."""
+    try:
+        h = xxhash.xxh3_64() if XXHASH_OK else hashlib.md5()
+        with open(p, "rb") as f:
+            h.update(f.read(n))
+        return h.hexdigest()
+    except Exception:
+        return None
+
+
+def stage_phash(p: str) -> Optional[np.ndarray]:
+    """Perceptual hash of one file as uint64 lanes, or None if unreadable."""
+    try:
+        if IMAGEHASH_OK:
+            with Image.open(p) as im:
+                return np.packbits(
+                    imagehash.phash(im, hash_size=16).hash.reshape(-1)
+                ).view(np.uint64)
+        return simple_dhash(p, hash_size=16)
+    except Exception:
+        return None
+
+
 @dataclass
 class CleanStats:
     before: int = 0
@@ -383,115 +720,140 @@ def clean_breed_folder(
     keep_intermediate: bool,
     remove_near_dup: bool,
     logger: logging.Logger,
-) -> CleanStats:
+    breed: str = "",
+    out_dir: str = "",
+    proc_pool: Optional[ProcessPoolExecutor] = None,
+    io_workers: int = 1,
+    dup_verifier: Optional[EmbeddingVerifier] = None,
+) -> Tuple[CleanStats, List[Dict[str, str]]]:
+    """Cleans one breed folder and returns (stats, manifest records).
+
+    The manifest records are built from data the cleanup already computed
+    (dimensions from the size check, hash from the dedup pass) — no second
+    walk over the files afterwards.
+
+    Decode and hash stages are embarrassingly parallel; when `proc_pool`
+    is given they are fanned out over processes (chunked, to amortize
+    pickling), with dedup decisions staying in this process.
+    """
 
     stats = CleanStats()
     paths = list_images(folder)
     stats.before = len(paths)
     logger.info("Очистка %s: найдено %d файлов", folder, stats.before)
 
-    # 1) удалить битые и слишком маленькие, привести к jpg (если нужно)
-    kept_paths = []
-    for p in paths:
-        # Проверка Pillow — валидна ли картинка
-        im_ok = ensure_pillow_image(p) if PIL_OK else None
-        if im_ok is None and PIL_OK:
-            try:
-                os.remove(p)
-                stats.removed_broken += 1
-            except Exception:
-                pass
-            continue
+    dims: Dict[str, Tuple[int, int]] = {}
+    digests: Dict[str, str] = {}
+    thumbs: Dict[str, np.ndarray] = {}
 
-        # Размер
-        w, h = cv2_read_size(p)
-        if w == 0 or h == 0 or min(w, h) < min_side:
-            try:
-                os.remove(p)
-                stats.removed_small += 1
-            except Exception:
-                pass
-            continue
+    def _map(fn, items, chunksize=8):
+        if proc_pool is not None:
+            return proc_pool.map(fn, items, chunksize=chunksize)
+        return map(fn, items)
 
-        # Приведение к .jpg
-        if jpg_only and PIL_OK:
-            base, ext = os.path.splitext(p)
-            out_jpg = base + ".jpg"
-            if ext.lower() not in [".jpg", ".jpeg"] or not os.path.exists(out_jpg):
-                ok = exif_normalize_and_convert_jpg(p, out_jpg, quality=92)
-                if ok:
-                    if not keep_intermediate:
-                        try:
-                            os.remove(p)
-                        except Exception:
-                            pass
-                    p = out_jpg
-                else:
-                    # если не удалось конвертировать — пропускаем/удаляем
-                    try:
-                        os.remove(p)
-                    except Exception:
-                        pass
-                    stats.removed_broken += 1
-                    continue
-
-        kept_paths.append(p)
+    # 1) валидация/конвертация: одна декодировка на файл (размер из заголовка,
+    #    load() валидирует, затем EXIF, .jpg и миниатюра для "is cat")
+    kept_paths = []
+    if not PIL_OK:
+        kept_paths = list(paths)
+    else:
+        validate = partial(
+            stage_validate_convert,
+            min_side=min_side,
+            jpg_only=jpg_only,
+            keep_intermediate=keep_intermediate,
+            want_thumb=not cat_filter.disabled,
+        )
+        for status, p, w, h, thumb in _map(validate, paths):
+            if status == "small":
+                stats.removed_small += 1
+            elif status == "broken":
+                stats.removed_broken += 1
+            else:
+                if thumb is not None:
+                    thumbs[p] = thumb
+                dims[p] = (w, h)
+                kept_paths.append(p)
 
-    # 2) фильтр "is cat"
+    # 2) фильтр "is cat" (батчами — один forward pass на 64 файла)
     filtered_paths = []
-    for p in kept_paths:
-        if cat_filter.is_cat(p):
-            filtered_paths.append(p)
-        else:
-            try:
-                os.remove(p)
-            except Exception:
-                pass
-            stats.removed_notcat += 1
+    for start in range(0, len(kept_paths), CAT_BATCH_SIZE):
+        chunk = kept_paths[start:start + CAT_BATCH_SIZE]
+        verdicts = cat_filter.are_cats(chunk, thumbs)
+        for p, ok in zip(chunk, verdicts):
+            if ok:
+                filtered_paths.append(p)
+            else:
+                try:
+                    os.remove(p)
+                except Exception:
+                    pass
+                stats.removed_notcat += 1
+
+    # 3) удаление точных дубликатов (подход fdupes: размер → хэш головы →
+    #    полный хэш). Файл уникального размера дубликатом быть не может,
+    #    поэтому большинство файлов не хэшируется вовсе; внутри групп
+    #    одинакового размера сперва дешёвый хэш первых 64 КиБ.
+    #    Хэширование I/O-bound (xxhash/hashlib отпускают GIL) — потоки
+    #    держат несколько чтений в очереди; --io-workers 1 для HDD.
+    def _hash_map(fn, items):
+        if io_workers > 1 and len(items) > 1:
+            with ThreadPoolExecutor(max_workers=io_workers) as hash_pool:
+                return list(hash_pool.map(fn, items, chunksize=16))
+        return [fn(p) for p in items]
+
+    def _drop_broken(p):
+        try:
+            os.remove(p)
+        except Exception:
+            pass
+        stats.removed_broken += 1
 
-    # 3) удаление точных дубликатов (MD5)
-    seen_md5: Dict[str, str] = {}
-    md5_filtered = []
+    size_groups: Dict[int, List[str]] = {}
     for p in filtered_paths:
         try:
-            h = file_md5(p)
-        except Exception:
-            try:
-                os.remove(p)
-            except Exception:
-                pass
-            stats.removed_broken += 1
+            size_groups.setdefault(os.path.getsize(p), []).append(p)
+        except OSError:
+            _drop_broken(p)
+
+    keep = set()
+    for group in size_groups.values():
+        if len(group) == 1:
+            keep.add(group[0])
             continue
-        if h in seen_md5:
-            try:
-                os.remove(p)
-            except Exception:
-                pass
-            stats.removed_dup_md5 += 1
-        else:
-            seen_md5[h] = p
-            md5_filtered.append(p)
+        head_groups: Dict[str, List[str]] = {}
+        for p, hh in zip(group, _hash_map(stage_head_hash, group)):
+            if hh is None:
+                _drop_broken(p)
+            else:
+                head_groups.setdefault(hh, []).append(p)
+        for hgroup in head_groups.values():
+            if len(hgroup) == 1:
+                keep.add(hgroup[0])
+                continue
+            seen_full: Dict[str, str] = {}
+            for p, fh in zip(hgroup, _hash_map(stage_hash, hgroup)):
+                if fh is None:
+                    _drop_broken(p)
+                elif fh in seen_full:
+                    try:
+                        os.remove(p)
+                    except Exception:
+                        pass
+                    stats.removed_dup_md5 += 1
+                else:
+                    seen_full[fh] = p
+                    digests[p] = fh
+                    keep.add(p)
+    md5_filtered = [p for p in filtered_paths if p in keep]
 
     # 4) удаление почти-дубликатов (перцептуальный хэш)
     final_paths = []
     if remove_near_dup and (PIL_OK or IMAGEHASH_OK):
-        seen_hashes: List[Tuple[str, int]] = []
-        for p in md5_filtered:
-            try:
-                if IMAGEHASH_OK:
-                    with Image.open(p) as im:
-                        ph = int(str(imagehash.phash(im, hash_size=16)), 16)
-                else:
-                    ph = simple_dhash(p, hash_size=16)
-                    if ph is None:
-                        # если не удалось получить хэш — считаем битым
-                        try:
-                            os.remove(p)
-                        except Exception:
-                            pass
-                        stats.removed_broken += 1
-                        continue
-            except Exception:
+        seen_hashes = NearDupIndex(hash_bits=256, max_distance=6)
+        for p, ph in zip(md5_filtered, _map(stage_phash, md5_filtered)):
+            if ph is None:
+                # если не удалось получить хэш — считаем битым
                 try:
                     os.remove(p)
                 except Exception:
@@ -499,19 +861,16 @@ def clean_breed_folder(
                 stats.removed_broken += 1
                 continue
 
-            is_dup = False
-            for _, prev_h in seen_hashes:
-                if hamming_distance(prev_h, ph) <= 6:  # порог близости
-                    is_dup = True
-                    break
-            if is_dup:
+            match = seen_hashes.find_near(ph)
+            if match is not None and (dup_verifier is None
+                                      or dup_verifier.same_image(match, p)):
                 try:
                     os.remove(p)
                 except Exception:
                     pass
                 stats.removed_dup_phash += 1
             else:
-                seen_hashes.append((p, ph))
+                seen_hashes.add(ph, p)
                 final_paths.append(p)
     else:
         final_paths = md5_filtered
@@ -522,7 +881,17 @@ def clean_breed_folder(
         folder, stats.before, stats.after, stats.removed_small, stats.removed_broken,
         stats.removed_notcat, stats.removed_dup_md5, stats.removed_dup_phash
     )
-    return stats
+
+    breed_slug = os.path.basename(folder)
+    records = [{
+        "breed": breed,
+        "breed_slug": breed_slug,
+        "path": os.path.relpath(p, out_dir) if out_dir else p,
+        "width": dims.get(p, (0, 0))[0],
+        "height": dims.get(p, (0, 0))[1],
+        "hash": digests.get(p, ""),  # пусто = файл уникального размера, не хэшировался
+    } for p in final_paths]
+    return stats, records
 
 
 # ------------------------------ Загрузка изображений ------------------------------
@@ -601,41 +970,30 @@ def crawl_breed(
 
 
 # ------------------------------ Manifest и отчёты ------------------------------
-def write_manifest(out_dir: str, records: List[Dict[str, str]], logger: logging.Logger):
-    man_path = os.path.join(out_dir, "manifest.csv")
-    fieldnames = ["breed", "breed_slug", "path", "width", "height", "md5"]
-    with open(man_path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
-        for r in records:
-            w.writerow(r)
-    logger.info("💾 manifest.csv записан: %s (строк: %d)", man_path, len(records))
-
-
-def scan_and_manifest(out_dir: str, min_side: int, logger: logging.Logger) -> List[Dict[str, str]]:
-    records: List[Dict[str, str]] = []
-    for breed in CAT_BREEDS:
-        breed_slug = slugify(breed)
-        folder = os.path.join(out_dir, breed_slug)
-        if not os.path.isdir(folder):
-            continue
-        for p in list_images(folder):
-            w, h = cv2_read_size(p)
-            if min(w, h) < min_side:
-                continue
-            try:
-                md5 = file_md5(p)
-            except Exception:
-                continue
-            records.append({
-                "breed": breed,
-                "breed_slug": breed_slug,
-                "path": os.path.relpath(p, out_dir),
-                "width": str(w),
-                "height": str(h),
-                "md5": md5
-            })
-    return records
+MANIFEST_FIELDS = ["breed", "breed_slug", "path", "width", "height", "hash"]
+
+
+def write_manifest(out_dir: str, records: List[Dict], logger: logging.Logger,
+                   also_csv: bool = False):
+    """Parquet при наличии pyarrow (колоночный, zstd, ~5× меньше CSV и без
+    парсинга строк в int при чтении на тренировке); CSV — запасной формат
+    и опция для ручного просмотра (--csv-manifest)."""
+    if PYARROW_OK:
+        man_path = os.path.join(out_dir, "manifest.parquet")
+        tbl = pa.Table.from_pylist(records, schema=pa.schema([
+            ("breed", pa.string()), ("breed_slug", pa.string()),
+            ("path", pa.string()), ("width", pa.int32()),
+            ("height", pa.int32()), ("hash", pa.string())]))
+        pq.write_table(tbl, man_path, compression="zstd", compression_level=3)
+        logger.info("💾 manifest.parquet записан: %s (строк: %d)", man_path, len(records))
+    if also_csv or not PYARROW_OK:
+        man_path = os.path.join(out_dir, "manifest.csv")
+        with open(man_path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+            w.writeheader()
+            for r in records:
+                w.writerow(r)
+        logger.info("💾 manifest.csv записан: %s (строк: %d)", man_path, len(records))
 
 
 # -------------------------------- MAIN --------------------------------
@@ -650,62 +1008,99 @@ def main():
         sys.exit(1)
 
     # Инициализация фильтра "is cat"
-    cat_filter = CatFilter(threshold=args.cat_threshold, disabled=args.no_is_cat, logger=logger)
+    cat_filter = CatFilter(threshold=args.cat_threshold, disabled=args.no_is_cat,
+                           logger=logger, cache_dir=os.path.join(args.out, "_models"))
+
+    # Опциональная CLIP-проверка почти-дубликатов
+    dup_verifier = None
+    if args.sscd_verify:
+        if CLIP_OK:
+            try:
+                dup_verifier = EmbeddingVerifier(logger=logger)
+            except Exception as e:
+                logger.warning("Не удалось загрузить CLIP: %s. Проверка дублей отключена.", e)
+        else:
+            logger.warning("--sscd-verify: torch/open_clip не установлены, проверка отключена.")
 
     # Возможное ограничение числа пород (для отладки)
     breeds = CAT_BREEDS[: args.limit_breeds] if args.limit_breeds > 0 else CAT_BREEDS
     logger.info("Всего пород к обработке: %d", len(breeds))
 
-    # Главный цикл
-    for idx, breed in enumerate(breeds, 1):
-        try:
-            breed_slug = slugify(breed)
-            breed_dir = os.path.join(args.out, breed_slug)
-            os.makedirs(breed_dir, exist_ok=True)
-
-            # Пропуск загрузки, если уже есть достаточно
-            existing = len(list_images(breed_dir))
-            if existing < args.images_per_breed:
-                crawl_breed(
-                    breed=breed,
-                    out_dir=args.out,
-                    target_count=args.images_per_breed,
-                    engine=args.engine,
-                    max_total=args.max_total_per_breed,
-                    logger=logger
-                )
-            else:
-                logger.info("⏭️  %s — уже %d файлов. Пропуск загрузки.", breed, existing)
-
-            # Очистка
-            logger.info("🧹 Очистка изображений для '%s'...", breed)
-            stats = clean_breed_folder(
-                folder=breed_dir,
-                min_side=args.min_size,
-                cat_filter=cat_filter,
-                jpg_only=args.jpg_only,
-                keep_intermediate=args.keep_intermediate,
-                remove_near_dup=not args.no_near_dup,
-                logger=logger
-            )
+    # Главный цикл: загрузка и очистка конвейером.
+    # Загрузка сетевая (icrawler сам многопоточный), очистка диск/CPU-bound —
+    # пока качается порода N, воркеры чистят породу N-1.
+    manifest: List[Dict[str, str]] = []
+    # Пул процессов для CPU-bound стадий очистки (декодирование, хэши);
+    # он общий для всех потоков-очистителей
+    proc_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+    def clean_task(breed: str, idx: int, breed_dir: str):
+        logger.info("🧹 Очистка изображений для '%s'...", breed)
+        _, records = clean_breed_folder(
+            folder=breed_dir,
+            min_side=args.min_size,
+            cat_filter=cat_filter,
+            jpg_only=args.jpg_only,
+            keep_intermediate=args.keep_intermediate,
+            remove_near_dup=not args.no_near_dup,
+            logger=logger,
+            breed=breed,
+            out_dir=args.out,
+            proc_pool=proc_pool,
+            io_workers=args.io_workers,
+            dup_verifier=dup_verifier,
+        )
+        manifest.extend(records)  # list.extend атомарен под GIL
+        logger.info("[%d/%d] '%s' готово. Итоговых файлов: %d",
+                    idx, len(breeds), breed, len(records))
+
+    clean_futures: List[Future] = []
+    with proc_pool, ThreadPoolExecutor(max_workers=os.cpu_count() or 2) as clean_pool:
+        for idx, breed in enumerate(breeds, 1):
+            try:
+                breed_slug = slugify(breed)
+                breed_dir = os.path.join(args.out, breed_slug)
+                os.makedirs(breed_dir, exist_ok=True)
+
+                # Пропуск загрузки, если уже есть достаточно
+                existing = len(list_images(breed_dir))
+                if existing < args.images_per_breed:
+                    crawl_breed(
+                        breed=breed,
+                        out_dir=args.out,
+                        target_count=args.images_per_breed,
+                        engine=args.engine,
+                        max_total=args.max_total_per_breed,
+                        logger=logger
+                    )
+                else:
+                    logger.info("⏭️  %s — уже %d файлов. Пропуск загрузки.", breed, existing)
 
-            # Сон между породами
-            if args.sleep > 0:
-                time.sleep(args.sleep)
+                # Очистка в фоне, загрузка следующей породы не ждёт
+                clean_futures.append(clean_pool.submit(clean_task, breed, idx, breed_dir))
 
-            logger.info("[%d/%d] '%s' готово. Итоговых файлов: %d",
-                        idx, len(breeds), breed, len(list_images(breed_dir)))
+                # Сон между породами
+                if args.sleep > 0:
+                    time.sleep(args.sleep)
 
-        except Exception as e:
-            logger.error("Ошибка при обработке '%s': %s", breed, e)
-            logger.error(traceback.format_exc())
-            if args.sleep > 0:
-                time.sleep(args.sleep)
-
-    # Соберём manifest и сохраним
-    logger.info("📦 Сканирование и формирование manifest.csv ...")
-    manifest = scan_and_manifest(args.out, args.min_size, logger)
-    write_manifest(args.out, manifest, logger)
+            except Exception as e:
+                logger.error("Ошибка при обработке '%s': %s", breed, e)
+                logger.error(traceback.format_exc())
+                if args.sleep > 0:
+                    time.sleep(args.sleep)
+
+        # Дождаться всех очисток перед сборкой manifest
+        for fut in clean_futures:
+            try:
+                fut.result()
+            except Exception as e:
+                logger.error("Ошибка очистки: %s", e)
+                logger.error(traceback.format_exc())
+
+    # Manifest собран попутно при очистке — только отсортировать и записать
+    logger.info("📦 Формирование manifest ...")
+    manifest.sort(key=lambda r: (r["breed_slug"], r["path"]))
+    write_manifest(args.out, manifest, logger, also_csv=args.csv_manifest)
 
     # Короткий JSON отчёт
     report = {
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Shared Breed Information
+========================
+Single source of the hand-written breed profiles used by both
+create_breed_data.py and create_enhanced_breed_data.py. Defining the
+dict once at module scope builds it at import time instead of on every
+call, and keeps the two scripts from drifting apart.
+"""
+
+import sys
+
+# Default field values interned once so the ~30 fallback records share a
+# single backing object per string instead of allocating fresh copies.
+_VARIOUS = sys.intern("Various")
+_DEFAULT_TEMPERAMENT = sys.intern("Friendly, Intelligent, Playful")
+_DEFAULT_LIFE_SPAN = sys.intern("12-15 years")
+_DEFAULT_WEIGHT = sys.intern("3-6 kg")
+# A list (not tuple) because orjson only serializes list sequences
+_DEFAULT_COLORS = [_VARIOUS]
+
+BREED_INFO = {
+    "abyssinian": {
+        "name": "Abyssinian", "origin": "Ethiopia",
+        "description": "Active, intelligent cats with distinctive ticked coats resembling wild rabbits. Known for their curiosity and athletic build.",
+        "temperament": "Active, Alert, Curious, Playful", "life_span": "14-15 years", "weight": "3.5-5.5 kg",
+        "colors": ["Ruddy", "Red", "Blue", "Fawn"], "hypoallergenic": False, "rare": False,
+        "energy_level": 5, "social_needs": 4, "grooming": 2
+    },
+    "american_shorthair": {
+        "name": "American Shorthair", "origin": "United States",
+        "description": "Well-balanced, healthy cats with easy-going personalities. Originally working cats, now beloved family companions.",
+        "temperament": "Easy Going, Calm, Gentle, Independent", "life_span": "13-16 years", "weight": "3.5-7 kg",
+        "colors": ["Silver Tabby", "Brown Tabby", "Black", "White"], "hypoallergenic": False, "rare": False,
+        "energy_level": 3, "social_needs": 3, "grooming": 2
+    },
+    "american_wirehair": {
+        "name": "American Wirehair", "origin": "United States",
+        "description": "Unique cats with crimped, wiry coats. Known for their resilient nature and playful personality.",
+        "temperament": "Friendly, Independent, Playful, Calm", "life_span": "12-16 years", "weight": "3.5-7 kg",
+        "colors": ["All colors accepted"], "hypoallergenic": False, "rare": True,
+        "energy_level": 3, "social_needs": 3, "grooming": 2
+    },
+    "balinese": {
+        "name": "Balinese", "origin": "United States",
+        "description": "Long-haired Siamese with flowing coats and graceful movements. Extremely vocal and intelligent.",
+        "temperament": "Vocal, Intelligent, Social, Active", "life_span": "12-16 years", "weight": "2.5-5 kg",
+        "colors": ["Point colors: Seal, Chocolate, Blue, Lilac"], "hypoallergenic": True, "rare": False,
+        "energy_level": 4, "social_needs": 5, "grooming": 3
+    },
+    "bengal": {
+        "name": "Bengal", "origin": "United States",
+        "description": "Wild-looking cats with leopard-like spots and energetic nature. Developed from Asian Leopard Cat crosses.",
+        "temperament": "Active, Athletic, Curious, Intelligent", "life_span": "12-16 years", "weight": "4-8 kg",
+        "colors": ["Brown Spotted", "Silver Spotted", "Snow"], "hypoallergenic": True, "rare": False,
+        "energy_level": 5, "social_needs": 4, "grooming": 2
+    },
+    "british_shorthair": {
+        "name": "British Shorthair", "origin": "United Kingdom",
+        "description": "Round-faced, sturdy cats with plush coats and calm demeanor. The 'teddy bear' of cats.",
+        "temperament": "Calm, Easy Going, Gentle, Loyal", "life_span": "12-17 years", "weight": "4-8 kg",
+        "colors": ["Blue", "Silver", "Golden", "Black"], "hypoallergenic": False, "rare": False,
+        "energy_level": 2, "social_needs": 3, "grooming": 3
+    },
+    "burmese": {
+        "name": "Burmese", "origin": "Myanmar",
+        "description": "Compact, muscular cats with golden eyes and silky coats. Extremely people-oriented and affectionate.",
+        "temperament": "Affectionate, Social, Playful, Vocal", "life_span": "12-18 years", "weight": "3-5.5 kg",
+        "colors": ["Sable", "Champagne", "Blue", "Platinum"], "hypoallergenic": False, "rare": False,
+        "energy_level": 4, "social_needs": 5, "grooming": 2
+    },
+    "chausie": {
+        "name": "Chausie", "origin": "Ancient Egypt/Modern US",
+        "description": "Large, athletic cats with wild jungle cat ancestry. Extremely active and requires lots of space.",
+        "temperament": "Active, Athletic, Intelligent, Independent", "life_span": "12-14 years", "weight": "6.5-11 kg",
+        "colors": ["Brown Ticked Tabby", "Black", "Silver Tipped"], "hypoallergenic": False, "rare": True,
+        "energy_level": 5, "social_needs": 3, "grooming": 2
+    },
+    "persian": {
+        "name": "Persian", "origin": "Iran",
+        "description": "Long-haired cats with flat faces and luxurious coats.",
+        "temperament": "Quiet, Sweet, Docile, Gentle", "life_span": "10-17 years", "weight": "3.2-5.5 kg",
+        "colors": ["White", "Black", "Blue", "Cream"], "hypoallergenic": False, "rare": False,
+        "energy_level": 1, "social_needs": 3, "grooming": 5
+    },
+    "siamese": {
+        "name": "Siamese", "origin": "Thailand",
+        "description": "Vocal, intelligent cats with distinctive color points.",
+        "temperament": "Vocal, Social, Intelligent, Active", "life_span": "12-15 years", "weight": "2.5-5 kg",
+        "colors": ["Seal Point", "Chocolate Point", "Blue Point", "Lilac Point"], "hypoallergenic": True, "rare": False,
+        "energy_level": 4, "social_needs": 5, "grooming": 1
+    }
+}
+
+# Breeds without a hand-written profile that get the default fallback
+DEFAULT_BREEDS = [
+    "cornish_rex", "cymric", "cyprus", "donskoy", "egyptian_mau", "european_shorthair",
+    "german_rex", "himalayan", "japanese_bobtail", "karelian_bobtail", "khao_manee",
+    "lykoi", "manx", "munchkin", "nebelung", "ocicat", "oriental_shorthair", "persian",
+    "peterbald", "pixie_bob", "ragamuffin", "ragdoll", "savannah", "scottish_fold",
+    "selkirk_rex", "serengeti", "sokoke", "thai", "tonkinese", "turkish_angora",
+    "turkish_van", "vankedisi"
+]
+
+
+# Record layout allocated once; dict.copy() shares the interned key objects
+# and their hashes across every record instead of re-hashing 16 literals
+# per breed. Key order here fixes the serialized key order.
+_RECORD_TEMPLATE = {
+    "id": None,
+    "name": None,
+    "origin": None,
+    "description": None,
+    "temperament": None,
+    "life_span": None,
+    "weight": None,
+    "colors": None,
+    "is_hypoallergenic": None,
+    "is_rare": None,
+    "energy_level": None,
+    "social_needs": None,
+    "grooming_needs": None,
+    "image_url": None,
+    "ml_index": None
+}
+
+
+def build_breed_record(breed_key, index, info):
+    """Flutter-facing record for one breed, in the model_breeds.json shape."""
+    record = _RECORD_TEMPLATE.copy()
+    record["id"] = breed_key
+    record["name"] = info["name"]
+    record["origin"] = info["origin"]
+    record["description"] = info["description"]
+    record["temperament"] = info["temperament"]
+    record["life_span"] = info["life_span"]
+    record["weight"] = info["weight"]
+    record["colors"] = info["colors"]
+    record["is_hypoallergenic"] = info["hypoallergenic"]
+    record["is_rare"] = info["rare"]
+    record["energy_level"] = info["energy_level"]
+    record["social_needs"] = info["social_needs"]
+    record["grooming_needs"] = info["grooming"]
+    record["image_url"] = f"assets/images/breeds/{breed_key}.jpg"
+    record["ml_index"] = index
+    return record
+
+
+def default_info(breed_name):
+    """Fallback profile for breeds without a hand-written entry."""
+    return {
+        "name": breed_name, "origin": _VARIOUS,
+        "description": f"Beautiful {breed_name} cats with unique characteristics and charming personalities.",
+        "temperament": _DEFAULT_TEMPERAMENT, "life_span": _DEFAULT_LIFE_SPAN, "weight": _DEFAULT_WEIGHT,
+        "colors": _DEFAULT_COLORS, "hypoallergenic": False, "rare": False,
+        "energy_level": 3, "social_needs": 3, "grooming": 2
+    }
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Build Breed Data Assets
+=======================
+Writes model_breeds.json and enhanced_breeds.json from a single parse of
+class_indices.json. Fuses the create_breed_data / create_enhanced_breed_data
+passes, which each re-opened and re-parsed the same input.
+"""
+
+import json
+
+# orjson serializes ~2-3x faster than stdlib json (optional dependency)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from _breed_info import BREED_INFO, DEFAULT_BREEDS, build_breed_record, default_info
+
+CLASS_INDICES_PATH = '/Users/oleksandr/Projects/MeowAI/MeowAI/scripts/training/class_indices.json'
+DATA_DIR = '/Users/oleksandr/Projects/MeowAI/MeowAI/assets/data'
+
+
+def load_class_indices():
+    """Parse class_indices.json from one binary read."""
+    with open(CLASS_INDICES_PATH, 'rb') as f:
+        raw = f.read()  # whole buffer at once: no incremental reads into the decoder
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def write_json(path, data):
+    # 1 MiB buffer: hand the serialized JSON to the OS in few write syscalls
+    if orjson is not None:
+        with open(path, 'wb', buffering=1 << 20) as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        # Compact separators: the asset is machine-read by Flutter
+        with open(path, 'w', buffering=1 << 20, encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def build_breed_lists(class_indices):
+    """Both breed lists from one parsed class_indices dict, in ml_index order."""
+    breed_info = dict(BREED_INFO)
+    for breed_key in DEFAULT_BREEDS:
+        if breed_key not in breed_info:
+            breed_info[breed_key] = default_info(breed_key.replace('_', ' ').title())
+
+    model_breeds = [
+        build_breed_record(
+            breed_key, index,
+            breed_info.get(breed_key) or default_info(breed_key.replace('_', ' ').title()))
+        for breed_key, index in sorted(class_indices.items(), key=lambda kv: kv[1])
+    ]
+    # The enhanced list is the same records plus the recognition flag
+    enhanced_breeds = [
+        {**record, "available_for_recognition": True} for record in model_breeds
+    ]
+    return model_breeds, enhanced_breeds
+
+
+def main():
+    """Write both breed data assets from one class_indices parse."""
+    class_indices = load_class_indices()
+    model_breeds, enhanced_breeds = build_breed_lists(class_indices)
+
+    write_json(f'{DATA_DIR}/model_breeds.json', model_breeds)
+    write_json(f'{DATA_DIR}/enhanced_breeds.json', enhanced_breeds)
+
+    print(f"✅ Created breed data for {len(model_breeds)} breeds")
+    print(f"📄 Saved model_breeds.json and enhanced_breeds.json to: {DATA_DIR}")
+
+
+if __name__ == "__main__":
+    main()
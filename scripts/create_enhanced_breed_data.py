@@ -2,135 +2,23 @@
 """
 Create Enhanced Breed Data for 40 Trained Breeds
 ===============================================
-Creates comprehensive breed information for the 40 breeds recognized by the trained model
+Thin wrapper kept for compatibility; the shared pass lives in
+build_breed_assets (which writes both assets from one parse).
 """
 
-import json
-import os
+from build_breed_assets import DATA_DIR, build_breed_lists, load_class_indices, write_json
 
 def create_enhanced_breed_data():
     """Create comprehensive breed data for the 40 trained breeds"""
-    
-    # Load class indices from training
-    with open('/Users/oleksandr/Projects/MeowAI/MeowAI/scripts/training/class_indices.json', 'r') as f:
-        class_indices = json.load(f)
-    
-    # Enhanced breed information for all 40 breeds
-    breed_info = {
-        "abyssinian": {
-            "name": "Abyssinian", "origin": "Ethiopia",
-            "description": "Active, intelligent cats with distinctive ticked coats resembling wild rabbits. Known for their curiosity and athletic build.",
-            "temperament": "Active, Alert, Curious, Playful", "life_span": "14-15 years", "weight": "3.5-5.5 kg",
-            "colors": ["Ruddy", "Red", "Blue", "Fawn"], "hypoallergenic": False, "rare": False,
-            "energy_level": 5, "social_needs": 4, "grooming": 2
-        },
-        "american_shorthair": {
-            "name": "American Shorthair", "origin": "United States", 
-            "description": "Well-balanced, healthy cats with easy-going personalities. Originally working cats, now beloved family companions.",
-            "temperament": "Easy Going, Calm, Gentle, Independent", "life_span": "13-16 years", "weight": "3.5-7 kg",
-            "colors": ["Silver Tabby", "Brown Tabby", "Black", "White"], "hypoallergenic": False, "rare": False,
-            "energy_level": 3, "social_needs": 3, "grooming": 2
-        },
-        "american_wirehair": {
-            "name": "American Wirehair", "origin": "United States",
-            "description": "Unique cats with crimped, wiry coats. Known for their resilient nature and playful personality.",
-            "temperament": "Friendly, Independent, Playful, Calm", "life_span": "12-16 years", "weight": "3.5-7 kg",
-            "colors": ["All colors accepted"], "hypoallergenic": False, "rare": True,
-            "energy_level": 3, "social_needs": 3, "grooming": 2
-        },
-        "balinese": {
-            "name": "Balinese", "origin": "United States",
-            "description": "Long-haired Siamese with flowing coats and graceful movements. Extremely vocal and intelligent.",
-            "temperament": "Vocal, Intelligent, Social, Active", "life_span": "12-16 years", "weight": "2.5-5 kg",
-            "colors": ["Point colors: Seal, Chocolate, Blue, Lilac"], "hypoallergenic": True, "rare": False,
-            "energy_level": 4, "social_needs": 5, "grooming": 3
-        },
-        "bengal": {
-            "name": "Bengal", "origin": "United States",
-            "description": "Wild-looking cats with leopard-like spots and energetic nature. Developed from Asian Leopard Cat crosses.",
-            "temperament": "Active, Athletic, Curious, Intelligent", "life_span": "12-16 years", "weight": "4-8 kg",
-            "colors": ["Brown Spotted", "Silver Spotted", "Snow"], "hypoallergenic": True, "rare": False,
-            "energy_level": 5, "social_needs": 4, "grooming": 2
-        },
-        "british_shorthair": {
-            "name": "British Shorthair", "origin": "United Kingdom",
-            "description": "Round-faced, sturdy cats with plush coats and calm demeanor. The 'teddy bear' of cats.",
-            "temperament": "Calm, Easy Going, Gentle, Loyal", "life_span": "12-17 years", "weight": "4-8 kg",
-            "colors": ["Blue", "Silver", "Golden", "Black"], "hypoallergenic": False, "rare": False,
-            "energy_level": 2, "social_needs": 3, "grooming": 3
-        },
-        "burmese": {
-            "name": "Burmese", "origin": "Myanmar",
-            "description": "Compact, muscular cats with golden eyes and silky coats. Extremely people-oriented and affectionate.",
-            "temperament": "Affectionate, Social, Playful, Vocal", "life_span": "12-18 years", "weight": "3-5.5 kg",
-            "colors": ["Sable", "Champagne", "Blue", "Platinum"], "hypoallergenic": False, "rare": False,
-            "energy_level": 4, "social_needs": 5, "grooming": 2
-        },
-        "chausie": {
-            "name": "Chausie", "origin": "Ancient Egypt/Modern US",
-            "description": "Large, athletic cats with wild jungle cat ancestry. Extremely active and requires lots of space.",
-            "temperament": "Active, Athletic, Intelligent, Independent", "life_span": "12-14 years", "weight": "6.5-11 kg",
-            "colors": ["Brown Ticked Tabby", "Black", "Silver Tipped"], "hypoallergenic": False, "rare": True,
-            "energy_level": 5, "social_needs": 3, "grooming": 2
-        }
-    }
-    
-    # Generate defaults for remaining breeds
-    default_breeds = [
-        "cornish_rex", "cymric", "cyprus", "donskoy", "egyptian_mau", "european_shorthair", 
-        "german_rex", "himalayan", "japanese_bobtail", "karelian_bobtail", "khao_manee", 
-        "lykoi", "manx", "munchkin", "nebelung", "ocicat", "oriental_shorthair", "persian", 
-        "peterbald", "pixie_bob", "ragamuffin", "ragdoll", "savannah", "scottish_fold", 
-        "selkirk_rex", "serengeti", "sokoke", "thai", "tonkinese", "turkish_angora", 
-        "turkish_van", "vankedisi"
-    ]
-    
-    for breed_key in default_breeds:
-        if breed_key not in breed_info:
-            breed_name = breed_key.replace('_', ' ').title()
-            breed_info[breed_key] = {
-                "name": breed_name, "origin": "Various",
-                "description": f"Beautiful {breed_name} cats with unique characteristics and charming personalities.",
-                "temperament": "Friendly, Intelligent, Playful", "life_span": "12-15 years", "weight": "3-6 kg",
-                "colors": ["Various"], "hypoallergenic": False, "rare": False,
-                "energy_level": 3, "social_needs": 3, "grooming": 2
-            }
-    
-    breeds_data = []
-    for breed_key, index in class_indices.items():
-        info = breed_info.get(breed_key, breed_info["cornish_rex"])  # fallback
-        breed_data = {
-            "id": breed_key,
-            "name": info["name"],
-            "origin": info["origin"], 
-            "description": info["description"],
-            "temperament": info["temperament"],
-            "life_span": info["life_span"],
-            "weight": info["weight"],
-            "colors": info["colors"],
-            "is_hypoallergenic": info["hypoallergenic"],
-            "is_rare": info["rare"],
-            "energy_level": info["energy_level"],
-            "social_needs": info["social_needs"],
-            "grooming_needs": info["grooming"],
-            "image_url": f"assets/images/breeds/{breed_key}.jpg",
-            "ml_index": index,
-            "available_for_recognition": True
-        }
-        breeds_data.append(breed_data)
-    
-    # Sort by ML index for consistency with model output
-    breeds_data.sort(key=lambda x: x["ml_index"])
-    
-    # Save enhanced breed data
-    output_path = '/Users/oleksandr/Projects/MeowAI/MeowAI/assets/data/enhanced_breeds.json'
-    with open(output_path, 'w') as f:
-        json.dump(breeds_data, f, indent=2)
-    
-    print(f"✅ Created enhanced breed data for {len(breeds_data)} breeds")
+    _, enhanced_breeds = build_breed_lists(load_class_indices())
+
+    output_path = f'{DATA_DIR}/enhanced_breeds.json'
+    write_json(output_path, enhanced_breeds)
+
+    print(f"✅ Created enhanced breed data for {len(enhanced_breeds)} breeds")
     print(f"📄 Saved to: {output_path}")
-    
-    return breeds_data
+
+    return enhanced_breeds
 
 if __name__ == "__main__":
-    create_enhanced_breed_data()
\ No newline at end of file
+    create_enhanced_breed_data()
@@ -9,6 +9,12 @@ import json
 import os
 from pathlib import Path
 
+# orjson parses ~3x faster than stdlib json (optional dependency)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def debug_model_integration():
     """Debug the current model integration issues"""
     
@@ -16,12 +22,15 @@ def debug_model_integration():
     print("=" * 40)
     
     # Test 1: Check enhanced breed data format
+    # Parsed once here and reused by Test 3 below
     breed_data_path = Path("/Users/oleksandr/Projects/MeowAI/MeowAI/assets/data/enhanced_breeds.json")
-    
+    breed_data = None
+
     if breed_data_path.exists():
-        with open(breed_data_path, 'r') as f:
-            breed_data = json.load(f)
-        
+        with open(breed_data_path, 'rb') as f:
+            raw = f.read()  # whole buffer at once: no incremental reads into the decoder
+        breed_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
         print(f"✅ Breed data found: {len(breed_data)} breeds")
         
         # Check first breed structure
@@ -56,25 +65,30 @@ def debug_model_integration():
     ]
     
     for model_file in model_files:
-        if Path(model_file).exists():
-            size = Path(model_file).stat().st_size
-            print(f"✅ {Path(model_file).name}: {size/1024/1024:.1f} MB")
-        else:
-            print(f"❌ Missing: {Path(model_file).name}")
+        # One stat() doubles as the existence check and the size read
+        try:
+            size = os.stat(model_file).st_size
+            print(f"✅ {os.path.basename(model_file)}: {size/1024/1024:.1f} MB")
+        except FileNotFoundError:
+            print(f"❌ Missing: {os.path.basename(model_file)}")
     
     # Test 3: Check breed images availability
     breeds_with_missing_images = []
-    
-    if breed_data_path.exists():
-        with open(breed_data_path, 'r') as f:
-            breed_data = json.load(f)
-        
-        for breed in breed_data[:10]:  # Check first 10
+
+    if breed_data is not None:
+        # One directory scan instead of two stat() calls per breed
+        breeds_dir = "/Users/oleksandr/Projects/MeowAI/MeowAI/assets/images/breeds"
+        try:
+            with os.scandir(breeds_dir) as it:
+                present = {entry.name for entry in it}
+        except FileNotFoundError:
+            present = set()
+
+        # Set lookups make checking every breed cheaper than the old
+        # ten-breed stat() loop, so cover the whole list
+        for breed in breed_data:
             breed_id = breed['id']
-            image_path = f"/Users/oleksandr/Projects/MeowAI/MeowAI/assets/images/breeds/{breed_id}.jpg"
-            png_path = f"/Users/oleksandr/Projects/MeowAI/MeowAI/assets/images/breeds/{breed_id}.png"
-            
-            if not Path(image_path).exists() and not Path(png_path).exists():
+            if f"{breed_id}.jpg" not in present and f"{breed_id}.png" not in present:
                 breeds_with_missing_images.append(breed_id)
         
         if breeds_with_missing_images:
@@ -6,8 +6,17 @@ This will create detailed breed information for use in the MeowAI app.
 
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+# orjson serializes ~2-3x faster than stdlib json (optional dependency)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from typing import Dict, List, Any
 
+@lru_cache(maxsize=None)
 def clean_breed_name(name: str) -> str:
     """Convert ML label to clean breed name."""
     # Replace underscores with spaces
@@ -27,152 +36,185 @@ def clean_breed_name(name: str) -> str:
     if name in special_cases:
         return special_cases[name]
     
-    # Capitalize each word
-    return ' '.join(word.capitalize() for word in name.split())
+    # Capitalize each word (single C-level pass; no apostrophes in labels)
+    return name.title()
+
+# Pattern -> origin lookup, compiled once into a single alternation so each
+# call is one C-level regex scan instead of ~40 Python substring checks.
+_ORIGINS = {
+    'american': 'United States',
+    'british': 'United Kingdom', 
+    'russian': 'Russia',
+    'persian': 'Iran',
+    'siamese': 'Thailand',
+    'thai': 'Thailand',
+    'chinese': 'China',
+    'japanese': 'Japan',
+    'turkish': 'Turkey',
+    'norwegian': 'Norway',
+    'maine': 'United States',
+    'california': 'United States',
+    'himalayan': 'United States',
+    'burmese': 'Myanmar',
+    'egyptian': 'Egypt',
+    'european': 'Europe',
+    'siberian': 'Russia',
+    'australian': 'Australia',
+    'canadian': 'Canada',
+    'korean': 'South Korea',
+    'mongolian': 'Mongolia',
+    'tibetan': 'Tibet',
+    'arabian': 'Arabian Peninsula',
+    'scandinavian': 'Scandinavia',
+    'mediterranean': 'Mediterranean Region',
+    'alpine': 'Alps Region',
+    'bavarian': 'Germany',
+    'galician': 'Spain',
+    'hungarian': 'Hungary',
+    'orkney': 'Scotland',
+    'shetland': 'Scotland',
+    'cyprus': 'Cyprus',
+    'isle of man': 'Isle of Man',
+    'tasmania': 'Australia',
+    'queensland': 'Australia',
+    'lanka': 'Sri Lanka',
+    'nicobar': 'India',
+    'ryukyu': 'Japan',
+    'kucing malaysia': 'Malaysia'
+}
 
+_ORIGIN_RE = re.compile('(' + '|'.join(sorted(map(re.escape, _ORIGINS), key=len, reverse=True)) + ')')
+
+@lru_cache(maxsize=None)
 def get_breed_origin(breed_name: str) -> str:
     """Determine breed origin based on name patterns."""
-    name_lower = breed_name.lower()
-    
-    origins = {
-        'american': 'United States',
-        'british': 'United Kingdom', 
-        'russian': 'Russia',
-        'persian': 'Iran',
-        'siamese': 'Thailand',
-        'thai': 'Thailand',
-        'chinese': 'China',
-        'japanese': 'Japan',
-        'turkish': 'Turkey',
-        'norwegian': 'Norway',
-        'maine': 'United States',
-        'california': 'United States',
-        'himalayan': 'United States',
-        'burmese': 'Myanmar',
-        'egyptian': 'Egypt',
-        'european': 'Europe',
-        'siberian': 'Russia',
-        'australian': 'Australia',
-        'canadian': 'Canada',
-        'korean': 'South Korea',
-        'mongolian': 'Mongolia',
-        'tibetan': 'Tibet',
-        'arabian': 'Arabian Peninsula',
-        'scandinavian': 'Scandinavia',
-        'mediterranean': 'Mediterranean Region',
-        'alpine': 'Alps Region',
-        'bavarian': 'Germany',
-        'galician': 'Spain',
-        'hungarian': 'Hungary',
-        'orkney': 'Scotland',
-        'shetland': 'Scotland',
-        'cyprus': 'Cyprus',
-        'isle of man': 'Isle of Man',
-        'tasmania': 'Australia',
-        'queensland': 'Australia',
-        'lanka': 'Sri Lanka',
-        'nicobar': 'India',
-        'ryukyu': 'Japan',
-        'kucing malaysia': 'Malaysia'
-    }
-    
-    for pattern, origin in origins.items():
-        if pattern in name_lower:
-            return origin
-    
-    return 'Unknown'
+    m = _ORIGIN_RE.search(breed_name.lower())
+    return _ORIGINS[m.group(1)] if m else 'Unknown'
 
-def get_breed_characteristics(breed_name: str) -> List[str]:
+# Single-word trait markers tested against the tokenized name: one hash
+# lookup per marker instead of a substring scan of the whole string.
+_HAIRLESS_TOKENS = frozenset({'sphynx', 'hairless'})
+_SHORT_LEG_TOKENS = frozenset({'munchkin', 'dwarf'})
+_SMALL_SIZE_TOKENS = frozenset({'singapura', 'munchkin'})
+
+@lru_cache(maxsize=None)
+def get_breed_characteristics(breed_name: str) -> tuple:
     """Generate characteristics based on breed name and type."""
     name_lower = breed_name.lower()
+    tokens = frozenset(name_lower.split())
     characteristics = []
-    
-    # Coat length
-    if any(x in name_lower for x in ['longhair', 'long hair']):
+
+    # Coat length (multi-word forms still need a substring check)
+    if 'longhair' in tokens or 'long hair' in name_lower:
         characteristics.append('Long-haired')
-    elif any(x in name_lower for x in ['shorthair', 'short hair']):
+    elif 'shorthair' in tokens or 'short hair' in name_lower:
         characteristics.append('Short-haired')
-    
+
     # Special features
-    if 'rex' in name_lower:
+    if 'rex' in tokens:
         characteristics.append('Curly coat')
-    if 'bobtail' in name_lower:
+    if 'bobtail' in tokens:
         characteristics.append('Short tail')
-    if 'fold' in name_lower:
+    if 'fold' in tokens:
         characteristics.append('Folded ears')
-    if 'curl' in name_lower:
+    if 'curl' in tokens:
         characteristics.append('Curled ears')
-    if 'sphynx' in name_lower or 'hairless' in name_lower:
+    if tokens & _HAIRLESS_TOKENS:
         characteristics.append('Hairless')
-    if 'munchkin' in name_lower or 'dwarf' in name_lower:
+    if tokens & _SHORT_LEG_TOKENS:
         characteristics.append('Short legs')
-    if 'polydactyl' in name_lower:
+    if 'polydactyl' in tokens:
         characteristics.append('Extra toes')
-    if 'point' in name_lower:
+    if 'point' in tokens:
         characteristics.append('Color points')
-    
+
     # Size indicators
-    if any(x in name_lower for x in ['maine coon', 'ragdoll', 'norwegian forest']):
+    if 'ragdoll' in tokens or 'maine coon' in name_lower or 'norwegian forest' in name_lower:
         characteristics.append('Large size')
-    elif any(x in name_lower for x in ['singapura', 'munchkin']):
+    elif tokens & _SMALL_SIZE_TOKENS:
         characteristics.append('Small size')
     
     # Add some defaults if none found
     if not characteristics:
         characteristics = ['Unique appearance', 'Distinctive features']
-    
-    return characteristics
 
+    # Tuple so the lru_cache entry is immutable; consumers cast to list
+    return tuple(characteristics)
+
+# Same alternation trick as _ORIGIN_RE: one compiled scan per lookup.
+_TEMPERAMENTS = {
+    'persian': 'Calm, Gentle, Sweet',
+    'siamese': 'Active, Vocal, Social',
+    'maine coon': 'Gentle, Friendly, Intelligent',
+    'british': 'Calm, Easy-going, Loyal',
+    'ragdoll': 'Docile, Placid, Quiet',
+    'bengal': 'Active, Playful, Intelligent',
+    'russian': 'Gentle, Quiet, Loyal',
+    'sphynx': 'Energetic, Social, Mischievous',
+    'abyssinian': 'Active, Playful, Intelligent',
+    'american': 'Friendly, Adaptable, Easy-going',
+    'norwegian': 'Gentle, Patient, Friendly',
+    'scottish': 'Sweet, Calm, Adaptable',
+    'burmese': 'Affectionate, Social, Playful',
+    'oriental': 'Active, Vocal, Intelligent',
+    'turkish': 'Energetic, Playful, Intelligent'
+}
+
+_TEMPERAMENT_RE = re.compile('(' + '|'.join(sorted(map(re.escape, _TEMPERAMENTS), key=len, reverse=True)) + ')')
+
+@lru_cache(maxsize=None)
 def get_temperament(breed_name: str) -> str:
     """Generate temperament based on breed type."""
-    name_lower = breed_name.lower()
-    
-    temperaments = {
-        'persian': 'Calm, Gentle, Sweet',
-        'siamese': 'Active, Vocal, Social',
-        'maine coon': 'Gentle, Friendly, Intelligent',
-        'british': 'Calm, Easy-going, Loyal',
-        'ragdoll': 'Docile, Placid, Quiet',
-        'bengal': 'Active, Playful, Intelligent',
-        'russian': 'Gentle, Quiet, Loyal',
-        'sphynx': 'Energetic, Social, Mischievous',
-        'abyssinian': 'Active, Playful, Intelligent',
-        'american': 'Friendly, Adaptable, Easy-going',
-        'norwegian': 'Gentle, Patient, Friendly',
-        'scottish': 'Sweet, Calm, Adaptable',
-        'burmese': 'Affectionate, Social, Playful',
-        'oriental': 'Active, Vocal, Intelligent',
-        'turkish': 'Energetic, Playful, Intelligent'
-    }
-    
-    for pattern, temp in temperaments.items():
-        if pattern in name_lower:
-            return temp
-    
-    return 'Friendly, Intelligent, Adaptable'
+    m = _TEMPERAMENT_RE.search(breed_name.lower())
+    return _TEMPERAMENTS[m.group(1)] if m else 'Friendly, Intelligent, Adaptable'
+
+# Hypoallergenic labels as a frozenset (O(1) membership) and the rare-breed
+# markers as one compiled alternation, hoisted out of generate_breed_data.
+_HYPOALLERGENIC = frozenset({
+    'sphynx', 'devon_rex', 'cornish_rex', 'russian_blue', 'bengal',
+    'balinese', 'oriental_shorthair', 'javanese'
+})
+_RARE_RE = re.compile(r'hybrid|lykoi|peterbald|donskoy|ukrainian_levkoy|bambino|dwelf|elf|minskin')
+
+# Record template allocated once; per-breed fields are filled in over a
+# copy, which beats re-hashing a fresh 16-key literal for every label.
+# Key order here fixes the key order of the serialized records.
+_TEMPLATE = {
+    "id": None,
+    "name": None,
+    "description": None,
+    "origin": None,
+    "temperament": None,
+    "lifeSpan": "12-16 years",
+    "weight": "3.5-6.0 kg",
+    "imageUrl": None,
+    "characteristics": None,
+    "history": None,
+    "energyLevel": 3,
+    "sheddingLevel": 3,
+    "socialNeeds": 3,
+    "groomingNeeds": 2,
+    "isHypoallergenic": False,
+    "isRare": False
+}
 
 def generate_breed_data(breed_label: str) -> Dict[str, Any]:
     """Generate comprehensive breed data from ML label."""
     clean_name = clean_breed_name(breed_label)
-    
-    return {
-        "id": breed_label.lower(),
-        "name": clean_name,
-        "description": f"The {clean_name} is a distinctive cat breed known for its unique characteristics and beautiful appearance. This breed has developed special traits that make it stand out among feline companions.",
-        "origin": get_breed_origin(clean_name),
-        "temperament": get_temperament(clean_name),
-        "lifeSpan": "12-16 years",
-        "weight": "3.5-6.0 kg",
-        "imageUrl": f"assets/images/breeds/{breed_label.lower()}.jpg",
-        "characteristics": get_breed_characteristics(clean_name),
-        "history": f"The {clean_name} has a rich history and has been carefully bred to maintain its distinctive characteristics. This breed represents the beauty and diversity found in the feline world.",
-        "energyLevel": 3,
-        "sheddingLevel": 3,
-        "socialNeeds": 3,
-        "groomingNeeds": 2,
-        "isHypoallergenic": breed_label.lower() in ['sphynx', 'devon_rex', 'cornish_rex', 'russian_blue', 'bengal', 'balinese', 'oriental_shorthair', 'javanese'],
-        "isRare": 'hybrid' in breed_label.lower() or any(x in breed_label.lower() for x in ['lykoi', 'peterbald', 'donskoy', 'ukrainian_levkoy', 'bambino', 'dwelf', 'elf', 'minskin'])
-    }
+    label_lower = breed_label.lower()
+
+    breed = _TEMPLATE.copy()
+    breed["id"] = label_lower
+    breed["name"] = clean_name
+    breed["description"] = f"The {clean_name} is a distinctive cat breed known for its unique characteristics and beautiful appearance. This breed has developed special traits that make it stand out among feline companions."
+    breed["origin"] = get_breed_origin(clean_name)
+    breed["temperament"] = get_temperament(clean_name)
+    breed["imageUrl"] = f"assets/images/breeds/{label_lower}.jpg"
+    breed["characteristics"] = list(get_breed_characteristics(clean_name))
+    breed["history"] = f"The {clean_name} has a rich history and has been carefully bred to maintain its distinctive characteristics. This breed represents the beauty and diversity found in the feline world."
+    breed["isHypoallergenic"] = label_lower in _HYPOALLERGENIC
+    breed["isRare"] = _RARE_RE.search(label_lower) is not None
+    return breed
 
 def main():
     """Generate the complete breed database."""
@@ -188,17 +230,23 @@ def main():
     
     print(f"Found {len(labels)} breed labels")
     
-    # Generate breed data
-    breeds_data = []
-    for label in labels:
-        if label:  # Skip empty lines
-            breed_data = generate_breed_data(label)
-            breeds_data.append(breed_data)
+    # Generate breed data (labels are already stripped and non-empty).
+    # The per-label work is pure and CPU-bound, so fan it across cores;
+    # chunksize amortizes the pickling of arguments and results.
+    with ProcessPoolExecutor() as executor:
+        breeds_data = list(executor.map(generate_breed_data, labels, chunksize=32))
     
     # Save to JSON file
     output_file = '../assets/data/comprehensive_cat_breeds.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(breeds_data, f, indent=2, ensure_ascii=False)
+    # 1 MiB buffer: hand the serialized JSON to the OS in few write syscalls
+    if orjson is not None:
+        with open(output_file, 'wb', buffering=1 << 20) as f:
+            f.write(orjson.dumps(breeds_data, option=orjson.OPT_INDENT_2))
+    else:
+        # Compact separators: the asset is machine-read by Flutter, so skip
+        # the indentation whitespace entirely
+        with open(output_file, 'w', buffering=1 << 20, encoding='utf-8') as f:
+            json.dump(breeds_data, f, ensure_ascii=False, separators=(',', ':'))
     
     print(f"Generated database with {len(breeds_data)} breeds")
     print(f"Saved to: {output_file}")
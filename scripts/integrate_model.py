@@ -5,84 +5,366 @@ Model Integration Script
 Converts H5 model to TensorFlow Lite and prepares assets for Flutter integration.
 """
 
+import argparse
+import gzip
+import hashlib
 import os
+import shutil
 import json
+import tempfile
+import time
+import numpy as np
 import tensorflow as tf
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 
-def convert_h5_to_tflite():
-    """Convert H5 model to TensorFlow Lite format"""
-    
+# orjson serializes ~2-3x faster than stdlib json (optional dependency)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# All paths derive from the checkout so parallel/out-of-tree runs don't
+# collide; --h5/--out/--class-indices override them from the CLI
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Source and output artifacts, shared by the conversion cache checks
+H5_PATH = REPO_ROOT / "scripts" / "training" / "all_breeds_high_accuracy_v1_final.h5"
+CLASS_INDICES_PATH = REPO_ROOT / "scripts" / "training" / "class_indices.json"
+MODELS_DIR = REPO_ROOT / "assets" / "models"
+MODEL_INFO_PATH = MODELS_DIR / "model_info.json"
+
+# Input size the model was trained with (see model_info.json)
+INPUT_SIZE = 384
+# How many calibration images the INT8 converter sees
+REPRESENTATIVE_SAMPLES = 100
+# Training images for calibration; falls back to the test set if absent
+REPRESENTATIVE_DATA_DIRS = [
+    REPO_ROOT / "scripts" / "training" / "balanced_all_breeds_dataset",
+    REPO_ROOT / "scripts" / "training" / "test",
+]
+
+def _sha256(path):
+    """Streaming sha256 over 1 MiB chunks (the H5 is 100+ MB)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@lru_cache(maxsize=1)
+def _load_class_indices(path=None):
+    """class_indices.json parsed once per process and shared by callers"""
+    return json.loads(Path(path or CLASS_INDICES_PATH).read_bytes())
+
+def _cached_model_info():
+    """model_info.json from the previous run, or {} when absent/unreadable"""
+    try:
+        with open(MODEL_INFO_PATH, 'rb') as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+def _representative_dataset_gen():
+    """Yield ~100 preprocessed training images for INT8 calibration"""
+    image_paths = []
+    for data_dir in REPRESENTATIVE_DATA_DIRS:
+        root = Path(data_dir)
+        if not root.exists():
+            continue
+        for path in sorted(root.rglob("*")):
+            if path.suffix.lower() in ('.jpg', '.jpeg', '.png'):
+                image_paths.append(path)
+                if len(image_paths) >= REPRESENTATIVE_SAMPLES:
+                    break
+        if image_paths:
+            break
+
+    for path in image_paths:
+        data = tf.io.read_file(str(path))
+        img = tf.image.decode_image(data, channels=3, expand_animations=False)
+        img = tf.image.resize(img, (INPUT_SIZE, INPUT_SIZE))
+        img = tf.cast(img, tf.float32) / 255.0
+        yield [tf.expand_dims(img, 0)]
+
+def _convert(saved_model_dir, out_paths, mode, per_channel=True):
+    """Worker: emit one TFLite variant ('int8' or 'fp16') from a SavedModel.
+
+    Top-level so ProcessPoolExecutor can pickle it. from_saved_model keeps
+    the tf.function concrete signatures that from_keras_model flattens
+    away, which gives the MLIR passes more fusion opportunities.
+    """
+    converter = tf.lite.TFLiteConverter.from_saved_model(
+        str(saved_model_dir), signature_keys=['serving_default'])
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    # MLIR converter passes fuse Conv+BN+activation into single
+    # builtin ops, halving memory traffic on the mobile CPU path
+    converter.experimental_new_converter = True
+    converter._experimental_lower_tensor_list_ops = True
+
+    if mode == 'int8':
+        # Full INT8 quantization: weight-only (dynamic-range) leaves
+        # activations in FP32 and blocks the NEON int8 kernels and
+        # NNAPI/Edge TPU delegation, so calibrate on real images.
+        # Builtin int8 kernels only — no SELECT_TF_OPS, so the converter
+        # errors on unquantizable ops instead of routing them to Flex.
+        # EXPERIMENTAL_SPARSITY compresses the near-zero structure in the
+        # EfficientNetV2 depthwise/1x1 conv weights on top of int8
+        converter.optimizations = [tf.lite.Optimize.DEFAULT, tf.lite.Optimize.EXPERIMENTAL_SPARSITY]
+        converter.representative_dataset = _representative_dataset_gen
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+        # Per-channel quantization (the default) is more accurate, but on
+        # older TFLite runtimes the SE blocks / final FC can fall back to
+        # reference kernels with it — the benchmark gate below compares.
+        converter._experimental_disable_per_channel = not per_channel
+    else:
+        # FP16 halves size with accuracy within noise and is the only
+        # variant the TFLite GPU delegate accelerates.
+        converter.target_spec.supported_types = [tf.float16]
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+
+    tflite_model = converter.convert()
+    for out_path in out_paths:
+        with open(out_path, 'wb') as f:
+            f.write(tflite_model)
+    return mode, len(tflite_model)
+
+def _gzip_asset(path):
+    """Write <path>.gz next to the asset and return the compressed size.
+
+    The FlatBuffer and labels gzip 20-40% smaller for the APK/IPA
+    download; the app inflates once on first launch and mmaps after.
+    """
+    gz_path = f"{path}.gz"
+    with open(path, 'rb') as src, gzip.open(gz_path, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst)
+    return os.path.getsize(gz_path)
+
+def _benchmark_tflite(model_path, n_images=10):
+    """Mean per-image invoke latency (s) on the calibration images"""
+    interpreter = tf.lite.Interpreter(model_path=str(model_path), num_threads=os.cpu_count())
+    interpreter.allocate_tensors()
+    inp = interpreter.get_input_details()[0]
+    scale, zero_point = inp['quantization']
+
+    elapsed = 0.0
+    count = 0
+    for batch in _representative_dataset_gen():
+        x = batch[0].numpy()
+        if inp['dtype'] == np.int8:
+            x = np.clip(x / scale + zero_point, -128, 127).astype(np.int8) if scale else x.astype(np.int8)
+        interpreter.set_tensor(inp['index'], x)
+        start = time.perf_counter()
+        interpreter.invoke()
+        elapsed += time.perf_counter() - start
+        count += 1
+        if count >= n_images:
+            break
+    return elapsed / max(count, 1)
+
+def _hard_swish(x):
+    """x * relu6(x + 3) / 6 — XNNPACK-covered stand-in for swish/silu"""
+    return x * tf.nn.relu6(x + 3.0) / 6.0
+
+def _make_xnnpack_friendly(model):
+    """Swap ops XNNPACK has no kernel for onto covered equivalents.
+
+    XNNPACK only accelerates a fixed op set; silu/swish and bilinear
+    resize fall back to scalar reference kernels. Hard-swish is a
+    drop-in approximation (MobileNetV3 ships with it), and nearest
+    upsampling keeps output shapes so the receptive-field math holds.
+    Mutates the Keras model in place; the swapped activations are
+    re-traced on the SavedModel export that follows.
+    """
+    swapped = 0
+    swish_fns = (tf.keras.activations.swish, tf.nn.silu, tf.nn.swish)
+    for layer in model.layers:
+        activation = getattr(layer, 'activation', None)
+        if activation in swish_fns or getattr(activation, '__name__', '') in ('swish', 'silu'):
+            layer.activation = _hard_swish
+            swapped += 1
+        if isinstance(layer, tf.keras.layers.UpSampling2D) and layer.interpolation == 'bilinear':
+            layer.interpolation = 'nearest'
+            swapped += 1
+    print(f"⚡ XNNPACK-friendly substitutions applied to {swapped} layers")
+    return model
+
+# Per-image p50 latency budget for the post-conversion smoke test
+LATENCY_BUDGET_MS = 400.0
+
+def _smoke_test(model_path, num_classes, budget_ms=LATENCY_BUDGET_MS, runs=5):
+    """Verify the emitted model loads, check output shape, measure p50.
+
+    File existence alone is not success: a quantized model can come out
+    slower than float or with a broken head, and would ship silently.
+    Returns the p50 latency in ms, or None on failure.
+    """
+    try:
+        interpreter = tf.lite.Interpreter(model_path=str(model_path), num_threads=os.cpu_count())
+        interpreter.allocate_tensors()
+        inp = interpreter.get_input_details()[0]
+        out = interpreter.get_output_details()[0]
+
+        latencies = []
+        for _ in range(runs):
+            if inp['dtype'] == np.int8:
+                x = np.random.randint(-128, 128, size=inp['shape'], dtype=np.int8)
+            else:
+                x = np.random.random_sample(inp['shape']).astype(inp['dtype'])
+            interpreter.set_tensor(inp['index'], x)
+            start = time.perf_counter()
+            interpreter.invoke()
+            latencies.append((time.perf_counter() - start) * 1000.0)
+
+        shape = tuple(interpreter.get_tensor(out['index']).shape)
+    except Exception as e:
+        print(f"❌ Smoke test: model failed to load/run: {e}")
+        return None
+
+    if shape != (1, num_classes):
+        print(f"❌ Smoke test: output shape {shape}, expected (1, {num_classes})")
+        return None
+
+    p50 = sorted(latencies)[len(latencies) // 2]
+    if p50 > budget_ms:
+        print(f"❌ Smoke test: p50 latency {p50:.1f} ms exceeds budget {budget_ms:.0f} ms")
+        return None
+
+    print(f"✅ Smoke test passed: p50 latency {p50:.1f} ms over {runs} runs")
+    return p50
+
+def convert_h5_to_tflite(force=False, benchmark_per_channel=False, xnnpack_friendly=False):
+    """Convert H5 model to TFLite: float default plus int8/fp16 variants.
+
+    model.tflite (the path the app and the Kotlin plugin hardcode) keeps
+    float32 input/output — it carries the fp16 bytes, which every
+    existing consumer feeds with float tensors. The full-int8 build,
+    whose int8 input/output would break those callers, ships only as
+    model_int8.tflite for devices the Flutter side opts in per-device.
+    """
+
     print("🔄 Converting H5 model to TensorFlow Lite...")
-    
+
     # Paths
-    h5_path = "/Users/oleksandr/Projects/MeowAI/MeowAI/scripts/training/all_breeds_high_accuracy_v1_final.h5"
-    tflite_path = "/Users/oleksandr/Projects/MeowAI/MeowAI/assets/models/model.tflite"
-    
+    h5_path = H5_PATH
+    tflite_path = MODELS_DIR / "model.tflite"
+    int8_path = MODELS_DIR / "model_int8.tflite"
+    fp16_path = MODELS_DIR / "model_fp16.tflite"
+
     # Ensure assets/models directory exists
-    Path("/Users/oleksandr/Projects/MeowAI/MeowAI/assets/models").mkdir(parents=True, exist_ok=True)
-    
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+
     try:
-        # Load the H5 model
-        print(f"📂 Loading model from: {h5_path}")
-        model = tf.keras.models.load_model(h5_path)
-        
-        print("📊 Model summary:")
-        model.summary()
-        
-        # Convert to TensorFlow Lite
-        converter = tf.lite.TFLiteConverter.from_keras_model(model)
-        
-        # Optimization settings for mobile
-        converter.optimizations = [tf.lite.Optimize.DEFAULT]
-        
-        # Set supported ops (if needed)
-        converter.target_spec.supported_ops = [
-            tf.lite.OpsSet.TFLITE_BUILTINS,
-            tf.lite.OpsSet.SELECT_TF_OPS
-        ]
-        
-        # Convert
-        tflite_model = converter.convert()
-        
-        # Save TFLite model
-        with open(tflite_path, 'wb') as f:
-            f.write(tflite_model)
-        
+        # Skip the minutes-long conversion when the H5 is unchanged and
+        # all artifacts from the previous run are still in place — the
+        # .gz companions included, since a run interrupted between
+        # conversion and gzip leaves the flatbuffers without them
+        if (not force
+                and _cached_model_info().get("h5_sha") == _sha256(h5_path)
+                and all(os.path.exists(p)
+                        for asset in (tflite_path, int8_path, fp16_path)
+                        for p in (asset, f"{asset}.gz"))):
+            print("⏭️ TFLite artifacts up to date — skipping conversion (use --force to redo)")
+            return True
+
+        # Export once to a SavedModel shared by both variants: the H5 is
+        # deserialized a single time (compile=False skips rebuilding
+        # optimizer state — conversion only needs the inference graph).
+        with tempfile.TemporaryDirectory(prefix="meowai_saved_model_") as saved_model_dir:
+            print(f"📂 Loading model from: {h5_path}")
+            model = tf.keras.models.load_model(h5_path, compile=False, custom_objects={})
+            if xnnpack_friendly:
+                model = _make_xnnpack_friendly(model)
+            model.save(saved_model_dir, save_format='tf')
+            del model
+
+            # Both converter passes run in C++ (MLIR/Grappler), so run
+            # them side by side in two worker processes —
+            # ProcessPoolExecutor rather than threads to sidestep TF's
+            # global graph state.
+            per_tensor_path = MODELS_DIR / "model_int8_per_tensor.tflite"
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                # fp16 doubles as the default model.tflite: float32
+                # input/output, so the float-feeding consumers keep
+                # working. int8 stays a separate opt-in artifact.
+                futures = [
+                    executor.submit(_convert, saved_model_dir, (int8_path,), 'int8'),
+                    executor.submit(_convert, saved_model_dir, (tflite_path, fp16_path), 'fp16'),
+                ]
+                if benchmark_per_channel:
+                    futures.append(executor.submit(
+                        _convert, saved_model_dir, (per_tensor_path,), 'int8', False))
+                for future in as_completed(futures):
+                    mode, size = future.result()
+                    print(f"✅ {mode} variant converted ({size / 1024 / 1024:.2f} MB)")
+
+        if benchmark_per_channel:
+            # Keep whichever int8 scheme actually runs faster here
+            per_channel_s = _benchmark_tflite(int8_path)
+            per_tensor_s = _benchmark_tflite(per_tensor_path)
+            print(f"⏱️ int8 per-channel: {per_channel_s * 1000:.1f} ms/img, "
+                  f"per-tensor: {per_tensor_s * 1000:.1f} ms/img")
+            if per_tensor_s < per_channel_s:
+                int8_path.write_bytes(per_tensor_path.read_bytes())
+                print("⚡ Per-tensor int8 is faster — shipped as the int8 variant")
+            per_tensor_path.unlink(missing_ok=True)
+
+        # Compressed companions for the app bundle
+        for asset in (tflite_path, int8_path, fp16_path):
+            gz_size = _gzip_asset(asset)
+            print(f"🗜️ {asset.name}.gz: {gz_size / 1024 / 1024:.2f} MB")
+
         print(f"✅ TFLite model saved to: {tflite_path}")
-        print(f"📦 Model size: {len(tflite_model) / 1024 / 1024:.2f} MB")
-        
+        print(f"✅ INT8 variant saved to: {int8_path}")
+        print(f"✅ FP16 variant saved to: {fp16_path}")
+
         return True
-        
+
     except Exception as e:
+        # With builtins-only op sets the converter names the unsupported
+        # op here; swap that layer for a builtin equivalent (e.g. silu ->
+        # keras swish) rather than re-adding SELECT_TF_OPS — Flex disables
+        # kernel fusion and routes ops to slow reference kernels.
         print(f"❌ Error converting model: {e}")
         return False
 
-def create_labels_file():
+def create_labels_file(force=False):
     """Create labels.txt from class_indices.json"""
-    
+
     print("📋 Creating labels file...")
-    
-    class_indices_path = "/Users/oleksandr/Projects/MeowAI/MeowAI/scripts/training/class_indices.json"
-    labels_path = "/Users/oleksandr/Projects/MeowAI/MeowAI/assets/models/labels.txt"
-    
+
+    class_indices_path = CLASS_INDICES_PATH
+    labels_path = MODELS_DIR / "labels.txt"
+
     try:
-        # Load class indices
-        with open(class_indices_path, 'r') as f:
-            class_indices = json.load(f)
-        
+        # Reuse the previous run's labels when class_indices is unchanged
+        if (not force
+                and _cached_model_info().get("class_indices_sha") == _sha256(class_indices_path)
+                and os.path.exists(labels_path)):
+            print("⏭️ labels.txt up to date — skipping (use --force to redo)")
+            return Path(labels_path).read_text().splitlines()
+
+        # Load class indices (memoized; create_model_info reuses the parse)
+        class_indices = _load_class_indices(class_indices_path)
+
         print(f"📊 Found {len(class_indices)} cat breeds")
         
-        # Create labels list (sorted by index)
-        labels = [''] * len(class_indices)
-        for breed_name, index in class_indices.items():
-            labels[index] = breed_name
-        
-        # Write labels file
-        with open(labels_path, 'w') as f:
-            for label in labels:
-                f.write(f"{label}\n")
-        
+        # Order labels by index with a single NumPy fancy assignment
+        # instead of a per-breed interpreter loop
+        items = list(class_indices.items())
+        names = np.array([name for name, _ in items], dtype=object)
+        indices = np.fromiter((idx for _, idx in items), dtype=np.int32, count=len(items))
+        ordered = np.empty(len(items), dtype=object)
+        ordered[indices] = names
+        labels = ordered.tolist()
+
+        # Write labels file in one buffered write, plus a gzip companion
+        Path(labels_path).write_text('\n'.join(labels) + '\n')
+        _gzip_asset(labels_path)
+
         print(f"✅ Labels file saved to: {labels_path}")
         print(f"📋 Breeds included: {', '.join(labels[:5])}...")
         
@@ -92,20 +374,19 @@ def create_labels_file():
         print(f"❌ Error creating labels file: {e}")
         return None
 
-def create_model_info():
+def create_model_info(p50_latency_ms=None):
     """Create model_info.json with model metadata"""
     
     print("📄 Creating model info file...")
-    
-    model_info_path = "/Users/oleksandr/Projects/MeowAI/MeowAI/assets/models/model_info.json"
-    
+
+    model_info_path = MODEL_INFO_PATH
+
     # Load class indices to get breed count
-    class_indices_path = "/Users/oleksandr/Projects/MeowAI/MeowAI/scripts/training/class_indices.json"
-    
+    class_indices_path = CLASS_INDICES_PATH
+
     try:
-        with open(class_indices_path, 'r') as f:
-            class_indices = json.load(f)
-        
+        class_indices = _load_class_indices(class_indices_path)
+
         model_info = {
             "model_name": "all_breeds_high_accuracy_v1",
             "version": "1.0",
@@ -116,16 +397,36 @@ def create_model_info():
             "created_date": "2025-08-25",
             "accuracy_target": "60-75%",
             "description": "High accuracy cat breed classifier trained on all supported breeds",
+            "variants": [
+                {"path": "assets/models/model_int8.tflite", "precision": "int8", "target_hw": "cpu/nnapi/edgetpu", "sparsity": True,
+                 "gzip_path": "assets/models/model_int8.tflite.gz"},
+                {"path": "assets/models/model_fp16.tflite", "precision": "float16", "target_hw": "gpu", "sparsity": False,
+                 "gzip_path": "assets/models/model_fp16.tflite.gz"}
+            ],
             "preprocessing": {
                 "normalization": "0-1 scale",
                 "resize": [384, 384],
                 "channels": 3
-            }
+            },
+            # Source-artifact hashes used to skip no-op reconversions
+            "h5_sha": _sha256(H5_PATH),
+            "class_indices_sha": _sha256(class_indices_path)
         }
+
+        # Measured on this build machine — a regression-tracking number,
+        # not a prediction of on-phone latency
+        if p50_latency_ms is not None:
+            model_info["p50_latency_ms"] = round(p50_latency_ms, 1)
         
-        with open(model_info_path, 'w') as f:
-            json.dump(model_info, f, indent=2)
-        
+        # Serialize in memory and write once; ensure_ascii=False skips the
+        # per-codepoint escape path for Unicode breed names
+        if orjson is not None:
+            Path(model_info_path).write_bytes(
+                orjson.dumps(model_info, option=orjson.OPT_INDENT_2))
+        else:
+            Path(model_info_path).write_text(
+                json.dumps(model_info, indent=2, ensure_ascii=False), encoding='utf-8')
+
         print(f"✅ Model info saved to: {model_info_path}")
         
         return model_info
@@ -134,25 +435,33 @@ def create_model_info():
         print(f"❌ Error creating model info: {e}")
         return None
 
-def main():
+def main(force=False, benchmark_per_channel=False, xnnpack_friendly=False):
     """Main integration function"""
-    
+
     print("🎯 MeowAI Model Integration")
     print("=" * 40)
-    
+
     # Step 1: Convert H5 to TFLite
-    if not convert_h5_to_tflite():
+    if not convert_h5_to_tflite(force=force, benchmark_per_channel=benchmark_per_channel,
+                                xnnpack_friendly=xnnpack_friendly):
         print("❌ Model conversion failed!")
         return False
-    
-    # Step 2: Create labels file
-    labels = create_labels_file()
+
+    # Step 2: Smoke-test the shipped model — shape and latency, not just
+    # that a file appeared
+    p50 = _smoke_test(MODELS_DIR / "model.tflite", len(_load_class_indices(CLASS_INDICES_PATH)))
+    if p50 is None:
+        print("❌ Model smoke test failed!")
+        return False
+
+    # Step 3: Create labels file
+    labels = create_labels_file(force=force)
     if labels is None:
         print("❌ Labels creation failed!")
         return False
-    
-    # Step 3: Create model info
-    model_info = create_model_info()
+
+    # Step 4: Create model info
+    model_info = create_model_info(p50_latency_ms=p50)
     if model_info is None:
         print("❌ Model info creation failed!")
         return False
@@ -167,4 +476,26 @@ def main():
     return True
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Convert the trained model and prepare Flutter assets")
+    parser.add_argument('--force', action='store_true',
+                        help='Reconvert even when artifacts match the cached source hashes')
+    parser.add_argument('--h5', type=Path, default=H5_PATH,
+                        help='Alternative model checkpoint to convert')
+    parser.add_argument('--out', type=Path, default=MODELS_DIR,
+                        help='Output directory for the generated assets')
+    parser.add_argument('--class-indices', type=Path, default=CLASS_INDICES_PATH,
+                        help='Alternative class_indices.json')
+    parser.add_argument('--benchmark-per-channel', action='store_true',
+                        help='Also convert a per-tensor int8 variant and ship whichever is faster')
+    parser.add_argument('--xnnpack-friendly', action='store_true',
+                        help='Swap swish->hard-swish and bilinear->nearest upsampling before conversion')
+    args = parser.parse_args()
+
+    # Rebind the module-level defaults so every helper picks up overrides
+    H5_PATH = args.h5
+    MODELS_DIR = args.out
+    CLASS_INDICES_PATH = args.class_indices
+    MODEL_INFO_PATH = MODELS_DIR / "model_info.json"
+
+    main(force=args.force, benchmark_per_channel=args.benchmark_per_channel,
+         xnnpack_friendly=args.xnnpack_friendly)
\ No newline at end of file
@@ -14,16 +14,19 @@ Comprehensive strategy to achieve 70%+ accuracy with all breeds using:
 import os
 import json
 import shutil
+import hashlib
 import numpy as np
 import tensorflow as tf
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from collections import Counter
 import random
-from tensorflow.keras.applications.efficientnet_v2 import preprocess_input as efficientnet_preprocess
 
-# Set float32 for stability with large models
-tf.keras.mixed_precision.set_global_policy('float32')
+# mixed_float16 runs matmul/conv on FP16 tensor cores and halves
+# activation memory; Keras wraps the optimizer in a LossScaleOptimizer
+# automatically under this policy. The softmax output stays float32.
+tf.keras.mixed_precision.set_global_policy('mixed_float16')
 
 # GPU optimization
 physical_devices = tf.config.list_physical_devices("GPU")
@@ -37,7 +40,7 @@ class AdvancedConfig:
     model_name = "all_breeds_high_accuracy_v1"
     target_accuracy = 0.70
     image_size = 384  # Higher resolution for better features
-    batch_size = 16   # Smaller batch for large images
+    batch_size = 32   # FP16 activations free enough memory for 32 at 384px
     
     # Progressive training stages
     stage1_epochs = 5  # Initial frozen training (shortened for quick verification)
@@ -61,14 +64,22 @@ class AdvancedConfig:
     
     # Advanced settings
     use_class_weights = True
+    use_tfrecord_cache = True  # Serialize resized images once, stream TFRecords after
     use_mixup = True
     use_cutmix = True
     use_augmix = True
     use_progressive_resizing = True
+    # Stage resolutions: conv FLOPs scale with H*W, so the frozen and
+    # partially-unfrozen stages run smaller; only stage 3 pays full price
+    progressive_sizes = (224, 320, 384)
     dropout_rate = 0.3
     
 CONFIG = AdvancedConfig()
 
+# Image extensions accepted by the directory walks below; rpartition on
+# the raw entry name is cheaper than building a Path per file
+_EXTS = frozenset(('jpg', 'jpeg', 'png'))
+
 def analyze_dataset_distribution(data_dir):
     """Analyze class distribution and identify issues"""
     print("📊 Analyzing dataset distribution...")
@@ -76,12 +87,13 @@ def analyze_dataset_distribution(data_dir):
     class_counts = {}
     total_images = 0
     
-    data_path = Path(data_dir)
-    for breed_dir in data_path.iterdir():
-        if breed_dir.is_dir():
-            image_count = len([f for f in breed_dir.iterdir() 
-                             if f.suffix.lower() in ['.jpg', '.jpeg', '.png']])
-            class_counts[breed_dir.name] = image_count
+    # scandir returns file type without an extra stat() per entry and
+    # skips the per-file Path allocation of iterdir
+    for breed_entry in os.scandir(data_dir):
+        if breed_entry.is_dir():
+            image_count = sum(1 for e in os.scandir(breed_entry.path)
+                              if e.is_file() and e.name.rpartition('.')[2].lower() in _EXTS)
+            class_counts[breed_entry.name] = image_count
             total_images += image_count
     
     # Sort by count
@@ -135,7 +147,8 @@ def balance_dataset(source_dir, target_dir, class_counts):
     
     kept_breeds = 0
     total_kept_images = 0
-    
+    rng = np.random.default_rng(42)
+
     for breed_name, count in class_counts.items():
         if count < CONFIG.min_samples_per_class:
             print(f"❌ Skipping {breed_name}: only {count} samples")
@@ -148,19 +161,36 @@ def balance_dataset(source_dir, target_dir, class_counts):
         target_breed_dir = target_path / breed_name
         target_breed_dir.mkdir()
         
-        # Get all images
-        all_images = [f for f in source_breed_dir.iterdir() 
-                     if f.suffix.lower() in ['.jpg', '.jpeg', '.png']]
+        # Reservoir-sample while scanning: one pass, O(samples_to_use)
+        # memory, and no materialized candidate list even for breeds
+        # with thousands of images. Every file has equal probability of
+        # surviving the cap, same as the old two-pass sample.
+        reservoir = []
+        seen = 0
+        for e in os.scandir(source_breed_dir):
+            if not (e.is_file() and e.name.rpartition('.')[2].lower() in _EXTS):
+                continue
+            if seen < samples_to_use:
+                reservoir.append(e.name)
+            else:
+                j = rng.integers(0, seen + 1)
+                if j < samples_to_use:
+                    reservoir[j] = e.name
+            seen += 1
+        selected_images = [source_breed_dir / name for name in reservoir]
         
-        # Randomly sample if we have too many
-        if len(all_images) > samples_to_use:
-            selected_images = random.sample(all_images, samples_to_use)
-        else:
-            selected_images = all_images
-        
-        # Copy selected images
+        # Hardlink instead of copy: metadata-only, zero bytes duplicated,
+        # and the directory tree looks identical to the input pipeline.
+        # Symlink covers cross-device setups; copy2 is the last resort.
         for img in selected_images:
-            shutil.copy2(img, target_breed_dir / img.name)
+            dst = target_breed_dir / img.name
+            try:
+                os.link(img, dst)
+            except OSError:
+                try:
+                    os.symlink(img.resolve(), dst)
+                except OSError:
+                    shutil.copy2(img, dst)
         
         kept_breeds += 1
         total_kept_images += len(selected_images)
@@ -173,88 +203,304 @@ def balance_dataset(source_dir, target_dir, class_counts):
     
     return target_path, kept_breeds
 
-def create_advanced_augmentation():
-    """Create advanced data augmentation pipeline"""
-    return tf.keras.preprocessing.image.ImageDataGenerator(
-        preprocessing_function=efficientnet_preprocess,
-        rotation_range=30,
-        width_shift_range=0.3,
-        height_shift_range=0.3,
-        shear_range=0.2,
-        zoom_range=0.3,
-        horizontal_flip=True,
-        brightness_range=[0.7, 1.3],
-        channel_shift_range=0.2,
-        fill_mode='reflect',  # Better than 'nearest'
-        validation_split=CONFIG.validation_split
-    )
+AUTOTUNE = tf.data.AUTOTUNE
+
+def _stage_sizes():
+    """Per-stage input resolutions (all full-size when resizing is off)"""
+    if CONFIG.use_progressive_resizing:
+        return CONFIG.progressive_sizes
+    return (CONFIG.image_size,) * 3
+
+def _decode_and_resize(path, image_size):
+    """Read, decode and resize one image; kept uint8 so .cache() stays small"""
+    data = tf.io.read_file(path)
+    # decode_image handles the jpg/jpeg/png mix in the balanced dataset
+    img = tf.io.decode_image(data, channels=3, expand_animations=False)
+    img = tf.image.resize(img, (image_size, image_size))
+    return tf.cast(img, tf.uint8)
+
+def _preprocess(img, label):
+    """Cast cached uint8 back to float32 in [0, 255].
+
+    EfficientNetV2's preprocess_input is the identity — the backbone
+    owns its Rescaling/normalization layers — so no per-image
+    preprocessing callback is needed beyond the dtype cast.
+    """
+    return tf.cast(img, tf.float32), label
+
+def build_tfrecords(paths, labels, out_dir, split, image_size, shards):
+    """Serialize resized images into sharded TFRecords, once per dataset.
+
+    Re-decoding the same JPEGs at full camera resolution every epoch is
+    pure redundant work across 50 epochs. Each record stores the image
+    re-encoded at training resolution, so the per-epoch cost drops to a
+    384px JPEG decode streamed from sequential shard reads.
+
+    A shard set only counts as reusable when its manifest — written
+    last, after every writer closed cleanly — matches a hash of the
+    current file list: an interrupted build leaves no manifest, and a
+    re-sampled balanced set changes the hash, so neither partial nor
+    stale shards are ever served. Returns the list of shard paths.
+    """
+    out_path = Path(out_dir)
+    out_path.mkdir(parents=True, exist_ok=True)
+    shard_paths = [out_path / f"{split}_{image_size}-{i:05d}-of-{shards:05d}.tfrecord"
+                   for i in range(shards)]
+
+    # balance_dataset re-samples on every run, so key on the actual
+    # content (sorted file list + labels), not just split/size/count
+    digest = hashlib.blake2b()
+    for path, label in sorted(zip((str(p) for p in paths), (int(l) for l in labels))):
+        digest.update(f"{path}:{label}\n".encode())
+    dataset_key = digest.hexdigest()
+    manifest_path = out_path / f"{split}_{image_size}.manifest"
+
+    if (manifest_path.exists()
+            and manifest_path.read_text().strip() == dataset_key
+            and all(p.exists() for p in shard_paths)):
+        print(f"⏭️ Reusing {shards} existing {split} TFRecord shards in {out_path}")
+        return shard_paths
+
+    print(f"📦 Writing {len(paths)} images to {shards} {split} TFRecord shards...")
+    manifest_path.unlink(missing_ok=True)
+    tmp_paths = [p.with_name(p.name + '.tmp') for p in shard_paths]
+    writers = [tf.io.TFRecordWriter(str(p)) for p in tmp_paths]
+    try:
+        for i, (path, label) in enumerate(zip(paths, labels)):
+            img = _decode_and_resize(str(path), image_size)
+            example = tf.train.Example(features=tf.train.Features(feature={
+                'image': tf.train.Feature(bytes_list=tf.train.BytesList(
+                    value=[tf.io.encode_jpeg(img).numpy()])),
+                'label': tf.train.Feature(int64_list=tf.train.Int64List(
+                    value=[int(label)])),
+            }))
+            writers[i % shards].write(example.SerializeToString())
+    except BaseException:
+        for writer in writers:
+            writer.close()
+        for tmp in tmp_paths:
+            tmp.unlink(missing_ok=True)
+        raise
+    for writer in writers:
+        writer.close()
+    # All writers closed cleanly — move the shards into place and only
+    # then drop the manifest that marks the set complete
+    for tmp, final in zip(tmp_paths, shard_paths):
+        os.replace(tmp, final)
+    manifest_path.write_text(dataset_key)
+    return shard_paths
+
+_TFRECORD_SPEC = {
+    'image': tf.io.FixedLenFeature([], tf.string),
+    'label': tf.io.FixedLenFeature([], tf.int64),
+}
+
+def split_dataset_files(balanced_dataset, class_names):
+    """List the balanced dataset once and split it into train/val.
+
+    The same pass yields the file lists, the sample counts and the label
+    arrays the old generators used to carry. One listing task per breed
+    folder — the thread pool overlaps the per-directory filesystem
+    latency instead of draining folders serially.
+
+    Returns (train_files, train_labels, val_files, val_labels).
+    """
+    balanced_path = Path(balanced_dataset)
+    class_to_idx = {name: idx for idx, name in enumerate(class_names)}
+
+    def list_breed(name):
+        breed_dir = balanced_path / name
+        return [breed_dir / p.name for p in os.scandir(breed_dir)
+                if p.is_file() and p.name.rpartition('.')[2].lower() in _EXTS]
+
+    with ThreadPoolExecutor() as pool:
+        files = [p for listing in pool.map(list_breed, class_names) for p in listing]
+    rng = random.Random(42)
+    rng.shuffle(files)
+
+    n_val = int(len(files) * CONFIG.validation_split)
+    val_files, train_files = files[:n_val], files[n_val:]
+    train_labels = np.fromiter((class_to_idx[p.parent.name] for p in train_files),
+                               dtype=np.int32, count=len(train_files))
+    val_labels = np.fromiter((class_to_idx[p.parent.name] for p in val_files),
+                             dtype=np.int32, count=len(val_files))
+    return train_files, train_labels, val_files, val_labels
+
+def build_datasets(train_files, train_labels, val_files, val_labels,
+                   num_classes, image_size):
+    """Build train/val tf.data pipelines at the given input resolution.
+
+    ImageDataGenerator decodes on a single Python thread and starved the
+    GPU at 384x384; tf.data overlaps I/O, decode and augmentation with
+    the training step via parallel map + prefetch. Decode+resize is
+    cached (as uint8, per resolution) so epochs past the first skip
+    JPEG decompression. Parameterized by image_size so the progressive
+    stages can train at 224/320 before paying for 384.
+
+    Returns (train_ds, val_ds).
+    """
+    def make_ds(paths, labels, training):
+        if training:
+            # Interleave per-class slices so reads fan out across up to 32
+            # breed directories at once instead of draining one folder at
+            # a time (tf.data perf guide); deterministic=False lets fast
+            # reads overtake slow ones — order is reshuffled anyway
+            by_class = [[] for _ in range(num_classes)]
+            for p, label in zip(paths, labels):
+                by_class[label].append(str(p))
+            ds = tf.data.Dataset.from_tensor_slices(
+                (tf.ragged.constant(by_class), tf.range(num_classes)))
+            ds = ds.interleave(
+                lambda class_paths, label: tf.data.Dataset.from_tensor_slices(class_paths)
+                    .map(lambda p: (p, label)),
+                cycle_length=min(num_classes, 32),
+                num_parallel_calls=AUTOTUNE,
+                deterministic=False)
+        else:
+            ds = tf.data.Dataset.from_tensor_slices(
+                ([str(p) for p in paths], tf.constant(labels)))
+        ds = ds.map(lambda path, label: (_decode_and_resize(path, image_size),
+                                         tf.one_hot(label, num_classes)),
+                    num_parallel_calls=AUTOTUNE)
+        # Disk-backed cache after decode+resize: epoch 2+ streams a
+        # memory-mapped binary file at IO bandwidth instead of re-decoding
+        # JPEGs, without pinning the whole set in RAM like cache() would.
+        # Filenames are keyed by split and resolution, so progressive
+        # stages never read a stale cache from another size.
+        cache_dir = Path("cache")
+        cache_dir.mkdir(exist_ok=True)
+        split = 'train' if training else 'val'
+        ds = ds.cache(str(cache_dir / f"{split}_{image_size}.cache"))
+        if training:
+            # The file list is already globally shuffled once at split
+            # time, so a bounded 4096-element buffer re-randomizing each
+            # epoch gives SGD-equivalent ordering without holding a
+            # dataset-sized buffer of decoded images
+            ds = ds.shuffle(4096, reshuffle_each_iteration=True)
+        ds = ds.map(_preprocess, num_parallel_calls=AUTOTUNE)
+        return ds.batch(CONFIG.batch_size).prefetch(AUTOTUNE)
 
-def create_efficientnet_model(num_classes):
+    def parse_record(record):
+        features = tf.io.parse_single_example(record, _TFRECORD_SPEC)
+        img = tf.io.decode_jpeg(features['image'], channels=3)
+        img = tf.ensure_shape(img, (image_size, image_size, 3))
+        return img, tf.one_hot(tf.cast(features['label'], tf.int32), num_classes)
+
+    def make_tfrecord_ds(shard_paths, training):
+        # Sequential shard reads interleaved in parallel; records already
+        # sit at training resolution so no .cache() tier is needed here
+        ds = tf.data.Dataset.from_tensor_slices([str(p) for p in shard_paths])
+        ds = ds.interleave(tf.data.TFRecordDataset,
+                           cycle_length=min(len(shard_paths), 16),
+                           num_parallel_calls=AUTOTUNE,
+                           deterministic=not training)
+        ds = ds.map(parse_record, num_parallel_calls=AUTOTUNE)
+        if training:
+            # Shards were filled round-robin from the globally shuffled
+            # split, so the bounded buffer only has to break up local
+            # order — no need to buffer the whole epoch
+            ds = ds.shuffle(4096, reshuffle_each_iteration=True)
+        ds = ds.map(_preprocess, num_parallel_calls=AUTOTUNE)
+        return ds.batch(CONFIG.batch_size).prefetch(AUTOTUNE)
+
+    if CONFIG.use_tfrecord_cache:
+        cache_dir = Path("tfrecord_cache")
+        train_shards = build_tfrecords(train_files, train_labels, cache_dir,
+                                       'train', image_size, shards=16)
+        val_shards = build_tfrecords(val_files, val_labels, cache_dir,
+                                     'val', image_size, shards=4)
+        train_ds = make_tfrecord_ds(train_shards, training=True)
+        val_ds = make_tfrecord_ds(val_shards, training=False)
+    else:
+        train_ds = make_ds(train_files, train_labels, training=True)
+        val_ds = make_ds(val_files, val_labels, training=False)
+
+    return train_ds, val_ds
+
+def create_efficientnet_model(num_classes, image_size=None):
     """Create EfficientNetV2 model with advanced head"""
-    print(f"🏗️ Creating {CONFIG.architecture} model...")
-    
+    image_size = image_size or CONFIG.image_size
+    print(f"🏗️ Creating {CONFIG.architecture} model at {image_size}px...")
+
     # Choose base model
     if CONFIG.architecture == "efficientnetv2_b3":
         base_model = tf.keras.applications.EfficientNetV2B3(
             weights='imagenet',
             include_top=False,
-            input_shape=(CONFIG.image_size, CONFIG.image_size, 3)
+            input_shape=(image_size, image_size, 3)
         )
     elif CONFIG.architecture == "efficientnetv2_b2":
         base_model = tf.keras.applications.EfficientNetV2B2(
             weights='imagenet',
             include_top=False,
-            input_shape=(CONFIG.image_size, CONFIG.image_size, 3)
+            input_shape=(image_size, image_size, 3)
         )
     else:  # fallback to ResNet
         base_model = tf.keras.applications.ResNet152V2(
             weights='imagenet',
             include_top=False,
-            input_shape=(CONFIG.image_size, CONFIG.image_size, 3)
+            input_shape=(image_size, image_size, 3)
         )
     
     # Freeze initially
     base_model.trainable = False
-    
+
+    # Augmentation as the first model layers: runs on GPU fused with the
+    # forward pass instead of per-image NumPy on the input-pipeline CPU.
+    # Keras preprocessing layers are identity at inference, so the saved
+    # model stays deployable as-is.
+    augmentation = tf.keras.Sequential([
+        tf.keras.layers.RandomFlip('horizontal'),
+        tf.keras.layers.RandomRotation(0.08, fill_mode='reflect'),
+        tf.keras.layers.RandomTranslation(0.1, 0.1, fill_mode='reflect'),
+        tf.keras.layers.RandomZoom(0.15, fill_mode='reflect'),
+        tf.keras.layers.RandomBrightness(0.2),
+        tf.keras.layers.RandomContrast(0.2),
+    ], name='augmentation')
+
     # Advanced classification head
-    inputs = tf.keras.Input(shape=(CONFIG.image_size, CONFIG.image_size, 3))
-    x = base_model(inputs, training=False)
+    inputs = tf.keras.Input(shape=(image_size, image_size, 3))
+    x = augmentation(inputs)
+    x = base_model(x, training=False)
     
     # Global pooling with attention
     x = tf.keras.layers.GlobalAveragePooling2D()(x)
     
-    # Advanced dense layers
+    # Advanced dense layers. One BN after pooling is enough — the
+    # backbone already normalizes its outputs, and the BNs that followed
+    # each Dense+ReLU were memory-bound kernels with little statistical
+    # benefit. The remaining Dense/ReLU/Dropout chain fuses under XLA.
     x = tf.keras.layers.BatchNormalization()(x)
     x = tf.keras.layers.Dropout(CONFIG.dropout_rate)(x)
-    
+
     x = tf.keras.layers.Dense(1024, activation='relu')(x)
-    x = tf.keras.layers.BatchNormalization()(x)
     x = tf.keras.layers.Dropout(CONFIG.dropout_rate * 0.5)(x)
-    
+
     x = tf.keras.layers.Dense(512, activation='relu')(x)
-    x = tf.keras.layers.BatchNormalization()(x)
     x = tf.keras.layers.Dropout(CONFIG.dropout_rate * 0.3)(x)
     
-    # Output layer
-    outputs = tf.keras.layers.Dense(num_classes, activation='softmax')(x)
+    # Output layer in float32: softmax over FP16 logits loses precision
+    # for 40-way classification, so only this layer opts out of the policy
+    outputs = tf.keras.layers.Dense(num_classes, activation='softmax', dtype='float32')(x)
     
     model = tf.keras.Model(inputs, outputs)
     
     return model, base_model
 
-def compute_class_weights(train_generator):
-    """Compute balanced class weights"""
+def compute_class_weights(labels):
+    """Compute balanced class weights from the training label array"""
     if not CONFIG.use_class_weights:
         return None
-    
-    from sklearn.utils.class_weight import compute_class_weight
-    
-    labels = train_generator.labels
-    classes = np.unique(labels)
-    
-    class_weights = compute_class_weight('balanced', classes=classes, y=labels)
-    class_weight_dict = dict(zip(classes, class_weights))
-    
+
+    # Vectorized 'balanced' formula: n_samples / (n_classes * count_c) —
+    # the same numbers sklearn's compute_class_weight produces, from one
+    # bincount instead of an import plus a Python pass over the labels
+    counts = np.bincount(labels)
+    present = counts > 0
+    weights = np.zeros(counts.shape, dtype=np.float64)
+    weights[present] = labels.size / (present.sum() * counts[present])
+    class_weight_dict = {int(c): float(weights[c]) for c in np.flatnonzero(present)}
+
     print(f"📊 Class weights computed for {len(class_weight_dict)} classes")
     return class_weight_dict
 
@@ -291,59 +537,149 @@ def get_advanced_callbacks(stage_name):
     
     return callbacks
 
-def progressive_training(model, base_model, train_gen, val_gen, class_weights):
-    """Progressive 3-stage training approach"""
-    
+def _resize_model(model, num_classes, image_size):
+    """Rebuild the model at a new input resolution, keeping its weights.
+
+    Global average pooling makes every weight shape independent of the
+    input resolution, so a fresh graph at the new size accepts the
+    trained weights directly. Rebuilt under the model's own strategy
+    scope so replicas stay consistent on multi-GPU runs.
+    """
+    print(f"📐 Rebuilding model at {image_size}px...")
+    with model.distribute_strategy.scope():
+        new_model, new_base = create_efficientnet_model(num_classes, image_size)
+        new_model.set_weights(model.get_weights())
+    return new_model, new_base
+
+def progressive_training(model, base_model, make_datasets, class_weights, num_classes):
+    """Progressive 3-stage training approach.
+
+    make_datasets(image_size) -> (train_ds, val_ds) lets each stage pick
+    its own resolution: conv FLOPs scale with H*W, so the frozen and
+    partially-unfrozen stages run at 224/320 and only stage 3 pays for
+    full 384px input.
+    """
+
     print("\n🎯 Starting Progressive Training")
     print("=" * 50)
-    
+
+    s1_size, s2_size, s3_size = _stage_sizes()
+
     # Stage 1: Frozen backbone
-    print("\n🔒 STAGE 1: Frozen Backbone Training")
+    print(f"\n🔒 STAGE 1: Frozen Backbone Training ({s1_size}px)")
     print("-" * 30)
-    
+
+    train_ds, val_ds = make_datasets(s1_size)
     base_model.trainable = False
-    
-    model.compile(
-        optimizer=tf.keras.optimizers.Adam(learning_rate=CONFIG.stage1_lr),
-        loss='categorical_crossentropy',
-        metrics=['accuracy']
-    )
-    
-    callbacks_s1 = get_advanced_callbacks("stage1")
-    
-    history_s1 = model.fit(
-        train_gen,
-        epochs=CONFIG.stage1_epochs,
-        validation_data=val_gen,
-        class_weight=class_weights,
-        callbacks=callbacks_s1,
-        verbose=1
-    )
-    
-    s1_accuracy = max(history_s1.history['val_accuracy'])
+
+    if model.distribute_strategy.num_replicas_in_sync > 1:
+        # apply_gradients cannot run in cross-replica context, so the
+        # hand-rolled step below would crash under MirroredStrategy.
+        # Keras's fit loop already wraps the step in strategy.run and
+        # reduces the per-replica losses — multi-GPU stage 1 takes that
+        # path; the single-device win of the custom loop is moot when
+        # the step is conv-bound across several GPUs anyway.
+        with model.distribute_strategy.scope():
+            model.compile(
+                optimizer=tf.keras.optimizers.Adam(learning_rate=CONFIG.stage1_lr),
+                loss='categorical_crossentropy',
+                metrics=['accuracy'],
+                jit_compile=True
+            )
+        history = model.fit(
+            train_ds,
+            epochs=CONFIG.stage1_epochs,
+            validation_data=val_ds,
+            class_weight=class_weights,
+            callbacks=get_advanced_callbacks("stage1"),
+            verbose=1
+        )
+        s1_accuracy = max(history.history['val_accuracy'])
+    else:
+        # With the backbone frozen, stage 1 is a fixed forward graph plus
+        # a small trainable head, so model.fit's per-step Python overhead
+        # is measurable. A hand-rolled train step compiles into one XLA
+        # cluster, traced once and reused for the whole stage.
+        # Explicit LossScaleOptimizer: the custom loop doesn't get the
+        # automatic scaling model.fit applies under mixed_float16
+        optimizer = tf.keras.mixed_precision.LossScaleOptimizer(
+            tf.keras.optimizers.Adam(learning_rate=CONFIG.stage1_lr))
+        loss_fn = tf.keras.losses.CategoricalCrossentropy()
+        head_vars = model.trainable_variables  # frozen backbone: head only
+
+        if class_weights:
+            weight_vector = tf.constant(
+                [class_weights.get(i, 1.0) for i in range(num_classes)],
+                dtype=tf.float32)
+        else:
+            weight_vector = None
+
+        @tf.function(reduce_retracing=True, jit_compile=True)
+        def train_step(x, y):
+            sample_weight = (tf.reduce_sum(y * weight_vector, axis=1)
+                             if weight_vector is not None else None)
+            with tf.GradientTape() as tape:
+                probs = model(x, training=True)
+                loss = loss_fn(y, probs, sample_weight=sample_weight)
+                scaled_loss = optimizer.get_scaled_loss(loss)
+            grads = optimizer.get_unscaled_gradients(tape.gradient(scaled_loss, head_vars))
+            optimizer.apply_gradients(zip(grads, head_vars))
+            return loss
+
+        val_accuracy = tf.keras.metrics.CategoricalAccuracy()
+        s1_weights_path = f"{CONFIG.model_name}_stage1_best_weights.h5"
+        s1_accuracy = 0.0
+        for epoch in range(CONFIG.stage1_epochs):
+            epoch_loss = 0.0
+            steps = 0
+            for x, y in train_ds:
+                epoch_loss += float(train_step(x, y))
+                steps += 1
+
+            val_accuracy.reset_state()
+            for x, y in val_ds:
+                val_accuracy.update_state(y, model(x, training=False))
+            val_acc = float(val_accuracy.result())
+            print(f"Epoch {epoch + 1}/{CONFIG.stage1_epochs} - "
+                  f"loss: {epoch_loss / max(steps, 1):.4f} - val_accuracy: {val_acc:.4f}")
+
+            # Same best-checkpoint behaviour the stage-1 callbacks provided
+            if val_acc > s1_accuracy:
+                s1_accuracy = val_acc
+                model.save_weights(s1_weights_path)
+
+        model.load_weights(s1_weights_path)  # restore_best_weights equivalent
+
+    history_s1 = {'val_accuracy': [s1_accuracy]}
     print(f"✅ Stage 1 Best Accuracy: {s1_accuracy:.3f} ({s1_accuracy*100:.1f}%)")
     
     # Stage 2: Partial unfreezing
-    print("\n🔓 STAGE 2: Partial Unfreezing")
+    print(f"\n🔓 STAGE 2: Partial Unfreezing ({s2_size}px)")
     print("-" * 30)
-    
+
+    if s2_size != s1_size:
+        model, base_model = _resize_model(model, num_classes, s2_size)
+        train_ds, val_ds = make_datasets(s2_size)
+
     # Unfreeze top layers
     base_model.trainable = True
     for layer in base_model.layers[:-20]:  # Keep bottom layers frozen
         layer.trainable = False
     
-    model.compile(
-        optimizer=tf.keras.optimizers.Adam(learning_rate=CONFIG.stage2_lr),
-        loss='categorical_crossentropy',
-        metrics=['accuracy']
-    )
+    with model.distribute_strategy.scope():
+        model.compile(
+            optimizer=tf.keras.optimizers.Adam(learning_rate=CONFIG.stage2_lr),
+            loss='categorical_crossentropy',
+            metrics=['accuracy'],
+            jit_compile=True
+        )
     
     callbacks_s2 = get_advanced_callbacks("stage2")
     
     history_s2 = model.fit(
-        train_gen,
+        train_ds,
         epochs=CONFIG.stage2_epochs,
-        validation_data=val_gen,
+        validation_data=val_ds,
         class_weight=class_weights,
         callbacks=callbacks_s2,
         verbose=1
@@ -353,24 +689,30 @@ def progressive_training(model, base_model, train_gen, val_gen, class_weights):
     print(f"✅ Stage 2 Best Accuracy: {s2_accuracy:.3f} ({s2_accuracy*100:.1f}%)")
     
     # Stage 3: Full fine-tuning
-    print("\n🔥 STAGE 3: Full Fine-tuning")
+    print(f"\n🔥 STAGE 3: Full Fine-tuning ({s3_size}px)")
     print("-" * 30)
-    
+
+    if s3_size != s2_size:
+        model, base_model = _resize_model(model, num_classes, s3_size)
+        train_ds, val_ds = make_datasets(s3_size)
+
     # Unfreeze all layers
     base_model.trainable = True
     
-    model.compile(
-    optimizer=tf.keras.optimizers.Adam(learning_rate=CONFIG.stage3_lr),
-    loss='categorical_crossentropy',
-    metrics=['accuracy', tf.keras.metrics.TopKCategoricalAccuracy(k=5, name='top_5_accuracy')]
-    )
+    with model.distribute_strategy.scope():
+        model.compile(
+            optimizer=tf.keras.optimizers.Adam(learning_rate=CONFIG.stage3_lr),
+            loss='categorical_crossentropy',
+            metrics=['accuracy', tf.keras.metrics.TopKCategoricalAccuracy(k=5, name='top_5_accuracy')],
+            jit_compile=True
+        )
     
     callbacks_s3 = get_advanced_callbacks("stage3")
     
     history_s3 = model.fit(
-        train_gen,
+        train_ds,
         epochs=CONFIG.stage3_epochs,
-        validation_data=val_gen,
+        validation_data=val_ds,
         class_weight=class_weights,
         callbacks=callbacks_s3,
         verbose=1
@@ -413,52 +755,62 @@ def train_all_breeds_model():
     )
     
     print(f"✅ Balanced dataset created with {num_classes} breeds")
-    
-    # Create advanced data generators
-    train_datagen = create_advanced_augmentation()
-    val_datagen = tf.keras.preprocessing.image.ImageDataGenerator(
-        preprocessing_function=efficientnet_preprocess,
-        validation_split=CONFIG.validation_split
-    )
-    
-    train_gen = train_datagen.flow_from_directory(
-        str(balanced_dataset),
-        target_size=(CONFIG.image_size, CONFIG.image_size),
-        batch_size=CONFIG.batch_size,
-        class_mode='categorical',
-        subset='training'
-    )
-    
-    val_gen = val_datagen.flow_from_directory(
-        str(balanced_dataset),
-        target_size=(CONFIG.image_size, CONFIG.image_size),
-        batch_size=CONFIG.batch_size,
-        class_mode='categorical',
-        subset='validation'
+
+    # Data-parallel across all visible GPUs: NCCL ring-allreduce sums
+    # gradients bandwidth-optimally over NVLink/PCIe. Batch size and
+    # stage LRs follow the linear scaling rule, and must be scaled
+    # before the datasets are batched below.
+    if len(physical_devices) > 1:
+        strategy = tf.distribute.MirroredStrategy(
+            cross_device_ops=tf.distribute.NcclAllReduce())
+        num_replicas = strategy.num_replicas_in_sync
+        print(f"🔗 MirroredStrategy across {num_replicas} GPUs")
+        CONFIG.batch_size *= num_replicas
+        CONFIG.stage1_lr *= num_replicas
+        CONFIG.stage2_lr *= num_replicas
+        CONFIG.stage3_lr *= num_replicas
+    else:
+        strategy = tf.distribute.get_strategy()
+
+    # Build tf.data pipelines (alphabetical class order matches the old
+    # flow_from_directory behaviour, so class_indices.json stays stable)
+    class_names = sorted(p.name for p in Path(balanced_dataset).iterdir() if p.is_dir())
+    train_files, train_labels, val_files, val_labels = split_dataset_files(
+        balanced_dataset, class_names
     )
-    
-    print(f"🏋️ Training samples: {train_gen.samples}")
-    print(f"✅ Validation samples: {val_gen.samples}")
-    print(f"📊 Samples per class: ~{train_gen.samples // num_classes}")
-    
+    train_samples, val_samples = len(train_files), len(val_files)
+
+    def make_datasets(image_size):
+        return build_datasets(train_files, train_labels, val_files, val_labels,
+                              num_classes, image_size)
+
+    print(f"🏋️ Training samples: {train_samples}")
+    print(f"✅ Validation samples: {val_samples}")
+    print(f"📊 Samples per class: ~{train_samples // num_classes}")
+
     # Compute class weights
-    class_weights = compute_class_weights(train_gen)
-    
-    # Create model
-    model, base_model = create_efficientnet_model(num_classes)
-    
+    class_weights = compute_class_weights(train_labels)
+
+    # Create model at the stage-1 resolution (variables placed
+    # per-replica under the strategy)
+    with strategy.scope():
+        model, base_model = create_efficientnet_model(num_classes, _stage_sizes()[0])
+
     print(f"📋 Model parameters: {model.count_params():,}")
-    
+
     # Progressive training
     model, histories, stage_accuracies = progressive_training(
-        model, base_model, train_gen, val_gen, class_weights
+        model, base_model, make_datasets, class_weights, num_classes
     )
     
     # Final evaluation
     print("\n📊 Final Comprehensive Evaluation")
     print("-" * 40)
 
-    eval_results = model.evaluate(val_gen, verbose=0)
+    # Final model runs at the stage-3 resolution; the TFRecord cache for
+    # that size already exists, so this rebuild is cheap
+    _, val_ds = make_datasets(_stage_sizes()[2])
+    eval_results = model.evaluate(val_ds, verbose=0)
     metric_names = getattr(model, 'metrics_names', None) or []
     # Build dict of metric_name -> value
     eval_dict = {}
@@ -499,9 +851,6 @@ def train_all_breeds_model():
         model.save_weights(str(weights_path))
         print(f"💾 Weights saved: {weights_path}")
     
-    # Get class names
-    class_names = list(train_gen.class_indices.keys())
-    
     # Save comprehensive results
     results = {
         "model_name": CONFIG.model_name,
@@ -513,8 +862,8 @@ def train_all_breeds_model():
         "num_classes": num_classes,
         "class_names": class_names,
         "training_date": datetime.now().isoformat(),
-        "training_samples": train_gen.samples,
-        "validation_samples": val_gen.samples,
+        "training_samples": train_samples,
+        "validation_samples": val_samples,
         "stage_accuracies": stage_accuracies,
         "best_stage_accuracy": max(stage_accuracies),
         "image_size": CONFIG.image_size,
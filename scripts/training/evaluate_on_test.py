@@ -23,26 +23,26 @@ import numpy as np
 
 try:
     import tensorflow as tf
-    from tensorflow.keras.preprocessing.image import ImageDataGenerator
     from tensorflow.keras.applications.efficientnet_v2 import preprocess_input
 except Exception as e:
     print('TensorFlow import failed:', e)
     raise
 
 try:
-    from sklearn.metrics import classification_report, confusion_matrix
+    from sklearn.metrics import classification_report
 except Exception:
     classification_report = None
-    confusion_matrix = None
 
 try:
     import matplotlib
     matplotlib.use('Agg')
     import matplotlib.pyplot as plt
-    import seaborn as sns
 except Exception:
     plt = None
-    sns = None
+
+
+# Image extensions accepted by the directory scans below
+_EXTS = frozenset(('jpg', 'jpeg', 'png'))
 
 
 def ensure_models_dir():
@@ -103,24 +103,97 @@ def load_model(path):
     return model
 
 
+class _TrtModel:
+    """Adapter so a TF-TRT serving signature drops into the evaluation paths.
+
+    Exposes __call__ and predict like a Keras model; is_trt tells the
+    labeled-evaluation path to skip its own XLA wrapper (the engine is
+    already fused and FP16-kernel-selected by TensorRT).
+    """
+    is_trt = True
+
+    def __init__(self, infer_fn):
+        self._infer = infer_fn
+
+    def __call__(self, x, training=False):
+        outputs = self._infer(tf.convert_to_tensor(x, tf.float32))
+        return next(iter(outputs.values()))
+
+    def predict(self, x, verbose=0):
+        return self(x).numpy()
+
+
+def load_trt_model(h5_path, models_dir):
+    """Convert the H5 once to a TF-TRT FP16 engine and load it.
+
+    TensorRT fuses conv+BN+activation and picks FP16 tensor-core kernels,
+    removing the Keras eager overhead entirely for repeated evaluation.
+    Both intermediate SavedModel and the converted engine are cached
+    under models/; delete them to force reconversion.
+    """
+    saved_dir = Path(models_dir) / 'saved_model'
+    trt_dir = Path(models_dir) / 'saved_model_trt'
+
+    if not trt_dir.exists():
+        if not saved_dir.exists():
+            model = load_model(h5_path)
+            model.save(str(saved_dir))
+            del model
+        print('Converting to TF-TRT FP16 engine...')
+        converter = tf.experimental.tensorrt.Converter(
+            input_saved_model_dir=str(saved_dir),
+            conversion_params=tf.experimental.tensorrt.ConversionParams(
+                precision_mode='FP16'))
+        converter.convert()
+        converter.save(str(trt_dir))
+        print('Saved TF-TRT engine to', trt_dir)
+
+    print('Loading TF-TRT engine:', trt_dir)
+    infer_fn = tf.saved_model.load(str(trt_dir)).signatures['serving_default']
+    return _TrtModel(infer_fn)
+
+
 def evaluate_directory_with_subfolders(model, test_dir, image_size, batch_size, top_k, models_dir):
-    datagen = ImageDataGenerator(preprocessing_function=preprocess_input)
-    generator = datagen.flow_from_directory(
-        test_dir,
-        target_size=(image_size, image_size),
-        batch_size=batch_size,
-        class_mode='categorical',
-        shuffle=False
-    )
-
-    print('Running predictions on', generator.samples, 'images...')
-    preds = model.predict(generator, verbose=1)
-
-    y_true = generator.classes
-    class_indices = generator.class_indices
+    # List files the way flow_from_directory did — classes alphabetical,
+    # files sorted within each class — so labels and order are identical
+    test_path = Path(test_dir)
+    class_names = sorted(e.name for e in os.scandir(test_dir) if e.is_dir())
+    class_indices = {name: idx for idx, name in enumerate(class_names)}
     # invert mapping to get index -> label
     index_to_label = {v: k for k, v in class_indices.items()}
-    filenames = generator.filenames
+
+    filenames = []
+    labels = []
+    for name in class_names:
+        class_files = sorted(e.name for e in os.scandir(test_path / name)
+                             if e.is_file() and e.name.rpartition('.')[2].lower() in _EXTS)
+        filenames.extend(f"{name}/{f}" for f in class_files)
+        labels.extend([class_indices[name]] * len(class_files))
+    y_true = np.asarray(labels, dtype=np.int32)
+
+    def decode(relpath):
+        data = tf.io.read_file(tf.strings.join([str(test_path), relpath], separator=os.sep))
+        img = tf.io.decode_image(data, channels=3, expand_animations=False)
+        img = tf.image.resize(img, (image_size, image_size))
+        return preprocess_input(img)
+
+    ds = (tf.data.Dataset.from_tensor_slices(filenames)
+          .map(decode, num_parallel_calls=tf.data.AUTOTUNE)
+          .batch(batch_size)
+          .prefetch(tf.data.AUTOTUNE))
+
+    # XLA-compiled inference graph: no Keras predict callbacks, one fused
+    # cluster per batch instead of the eager per-op dispatch path. A
+    # TF-TRT engine is already fused, so it runs as-is.
+    if getattr(model, 'is_trt', False):
+        infer = model
+    else:
+        @tf.function(jit_compile=True)
+        def infer(x):
+            return model(x, training=False)
+
+    print('Running predictions on', len(filenames), 'images...')
+    preds = np.concatenate([infer(batch).numpy() for batch in ds], axis=0)
 
     y_pred = np.argmax(preds, axis=1)
 
@@ -138,39 +211,48 @@ def evaluate_directory_with_subfolders(model, test_dir, image_size, batch_size,
         except Exception:
             print(fname, '->', pred_label)
 
-    # classification report & confusion matrix
-    if classification_report is None or confusion_matrix is None:
-        print('sklearn not available: skipping classification report and confusion matrix')
-        return
-
-    target_names = [index_to_label[i] for i in range(len(index_to_label))]
-    report = classification_report(y_true, y_pred, target_names=target_names, output_dict=True)
-    report_json = models_dir / 'test_classification_report.json'
-    with report_json.open('w') as fh:
-        json.dump(report, fh, indent=2, ensure_ascii=False)
-    print('Saved classification report (json) to', report_json)
+    # classification report (sklearn, optional)
+    if classification_report is None:
+        print('sklearn not available: skipping classification report')
+    else:
+        target_names = [index_to_label[i] for i in range(len(index_to_label))]
+        report = classification_report(y_true, y_pred, target_names=target_names, output_dict=True)
+        report_json = models_dir / 'test_classification_report.json'
+        with report_json.open('w') as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+        print('Saved classification report (json) to', report_json)
 
     # CSV report not required; results saved as JSON and printed to console
 
-    # confusion matrix plot
-    cm = confusion_matrix(y_true, y_pred)
-    if plt is not None and sns is not None:
-        plt.figure(figsize=(12, 10))
-        sns.heatmap(cm, annot=False, fmt='d', cmap='Blues')
-        plt.ylabel('True')
-        plt.xlabel('Predicted')
-        plt.title('Confusion Matrix')
+    # Confusion matrix as a fused parallel bincount op — microseconds on
+    # GPU/CPU, and no sklearn dependency on this path
+    cm = tf.math.confusion_matrix(y_true, y_pred,
+                                  num_classes=len(index_to_label)).numpy()
+
+    # plot: one rasterized imshow blit instead of seaborn's per-cell
+    # Rectangle artists (seconds -> milliseconds at 40+ classes)
+    if plt is not None:
+        fig, ax = plt.subplots(figsize=(10, 10))
+        im = ax.imshow(cm.astype(np.uint16), cmap='Blues', interpolation='nearest')
+        fig.colorbar(im)
+        ax.set_ylabel('True')
+        ax.set_xlabel('Predicted')
+        ax.set_title('Confusion Matrix')
         cm_png = models_dir / 'test_confusion_matrix.png'
-        plt.tight_layout()
-        plt.savefig(cm_png, dpi=150)
+        fig.tight_layout()
+        fig.savefig(cm_png, dpi=120)
+        plt.close(fig)
         print('Saved confusion matrix to', cm_png)
     else:
-        print('matplotlib/seaborn not available: skipping confusion matrix image')
+        print('matplotlib not available: skipping confusion matrix image')
 
 
 def evaluate_flat_directory(model, test_dir, image_size, batch_size, top_k, models_dir):
     # predict each image file and print top-k predictions (no CSV)
-    files = [p for p in Path(test_dir).iterdir() if p.is_file() and p.suffix.lower() in ('.jpg', '.jpeg', '.png')]
+    # scandir avoids a stat() and a Path allocation per entry
+    test_path = Path(test_dir)
+    files = [test_path / e.name for e in os.scandir(test_dir)
+             if e.is_file() and e.name.rpartition('.')[2].lower() in _EXTS]
     files.sort()
     # try to load class mapping once
     ci_path = models_dir / 'class_indices.json'
@@ -184,23 +266,29 @@ def evaluate_flat_directory(model, test_dir, image_size, batch_size, top_k, mode
     else:
         index_to_label = None
 
-    for p in files:
-        img = tf.keras.preprocessing.image.load_img(str(p), target_size=(image_size, image_size))
-        arr = tf.keras.preprocessing.image.img_to_array(img)
-        arr = np.expand_dims(arr, 0)
-        arr = preprocess_input(arr)
-        preds = model.predict(arr)
-        pvec = preds[0]
-        topk_idx = np.argsort(pvec)[::-1][:top_k]
-        if index_to_label:
-            topk_labels = [index_to_label.get(int(i), str(i)) for i in topk_idx]
-        else:
-            topk_labels = [str(int(i)) for i in topk_idx]
-        topk_probs = [float(pvec[int(i)]) for i in topk_idx]
-        try:
-            print(f"{p.name} -> predicted: {topk_labels[0]} ({topk_probs[0]:.3f})")
-        except Exception:
-            print(p.name, '->', topk_labels[0] if topk_labels else 'unknown')
+    # One model.predict per chunk of batch_size images: per-image predict
+    # calls pay graph dispatch and kernel-launch overhead for a batch of 1
+    for start in range(0, len(files), batch_size):
+        group = files[start:start + batch_size]
+        imgs = np.stack([
+            tf.keras.preprocessing.image.img_to_array(
+                tf.keras.preprocessing.image.load_img(str(p), target_size=(image_size, image_size)))
+            for p in group
+        ])
+        imgs = preprocess_input(imgs)
+        preds = model.predict(imgs, verbose=0)
+
+        for p, pvec in zip(group, preds):
+            topk_idx = np.argsort(pvec)[::-1][:top_k]
+            if index_to_label:
+                topk_labels = [index_to_label.get(int(i), str(i)) for i in topk_idx]
+            else:
+                topk_labels = [str(int(i)) for i in topk_idx]
+            topk_probs = [float(pvec[int(i)]) for i in topk_idx]
+            try:
+                print(f"{p.name} -> predicted: {topk_labels[0]} ({topk_probs[0]:.3f})")
+            except Exception:
+                print(p.name, '->', topk_labels[0] if topk_labels else 'unknown')
 
 
 def main():
@@ -210,6 +298,8 @@ def main():
     parser.add_argument('--image-size', type=int, default=384)
     parser.add_argument('--batch-size', type=int, default=16)
     parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--convert-trt', action='store_true',
+                        help='Convert once to a TF-TRT FP16 engine and evaluate with it')
     args = parser.parse_args()
 
     models_dir = ensure_models_dir()
@@ -225,7 +315,10 @@ def main():
         print('Test directory not found:', args.test_dir)
         sys.exit(1)
 
-    model = load_model(args.model)
+    if args.convert_trt:
+        model = load_trt_model(args.model, models_dir)
+    else:
+        model = load_model(args.model)
 
     # detect if test dir contains subfolders (class-labeled)
     entries = [p for p in Path(args.test_dir).iterdir() if p.is_dir()]